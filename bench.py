@@ -0,0 +1,141 @@
+"""Headless simulation throughput benchmark
+
+Runs seeded games of the autonomous snake without a window, driving
+GameState.update exactly like the real game loop does, and reports ticks per
+second, wall time per game, final length distribution and death causes.
+
+    python bench.py --games 20 --strategy astar
+    python bench.py --save-baseline bench_baseline.json
+    python bench.py --baseline bench_baseline.json --threshold 10
+
+When a baseline is given the run exits with status 1 if throughput or mean
+final length dropped by more than the threshold percentage.
+"""
+import argparse
+import copy
+import json
+import sys
+import time
+from collections import Counter
+import numpy as np
+from config import config
+from game.game_state import GameState
+
+def make_config(strategy=None, particles=False):
+    """Copy of the global config prepared for headless runs"""
+    bench_config = copy.deepcopy(config)
+    bench_config['particles']['enabled'] = particles
+    if strategy is not None:
+        bench_config['ai']['strategy'] = strategy
+    return bench_config
+
+def run_game(game_config, seed, max_ticks):
+    """Play one seeded game until the snake dies or max_ticks moves were made
+
+    The clock advances by exactly one move interval per update call, so each
+    call runs one simulation tick through the same path as the real loop.
+
+    Returns:
+        dict: seed, ticks, final length, death cause and wall time
+    """
+    game_state = GameState(game_config, seed=seed)
+    current_time = 0
+    start = time.perf_counter()
+    game_state.update(current_time)
+    while not game_state.dying and game_state.snake.steps < max_ticks:
+        current_time += game_state.game_speed
+        game_state.update(current_time)
+    wall_time = time.perf_counter() - start
+
+    return {
+        'seed': seed,
+        'ticks': game_state.snake.steps,
+        'length': len(game_state.snake.body),
+        'cause': game_state.death_cause or 'max_ticks',
+        'wall_time': wall_time
+    }
+
+def summarize(results):
+    """Aggregate per-game results into the numbers reported and compared"""
+    ticks = sum(r['ticks'] for r in results)
+    wall = sum(r['wall_time'] for r in results)
+    lengths = np.array([r['length'] for r in results])
+    p0, p25, p50, p75, p100 = np.percentile(lengths, [0, 25, 50, 75, 100]).tolist()
+    return {
+        'games': len(results),
+        'ticks': ticks,
+        'wall_time': wall,
+        'ticks_per_sec': ticks / wall if wall > 0 else 0.0,
+        'wall_time_per_game': wall / len(results),
+        'mean_length': float(lengths.mean()),
+        'length_percentiles': {'min': p0, 'p25': p25, 'p50': p50, 'p75': p75, 'max': p100},
+        'causes': dict(Counter(r['cause'] for r in results))
+    }
+
+def compare(summary, baseline, threshold):
+    """List metrics that regressed by more than threshold percent"""
+    regressions = []
+    for metric in ('ticks_per_sec', 'mean_length'):
+        old, new = baseline.get(metric), summary[metric]
+        if not old:
+            continue
+        change = (new - old) / old * 100.0
+        print(f"  {metric}: {old:.1f} -> {new:.1f} ({change:+.1f}%)")
+        if change < -threshold:
+            regressions.append(metric)
+    return regressions
+
+def print_summary(summary):
+    lengths = summary['length_percentiles']
+    print(f"games:          {summary['games']}")
+    print(f"ticks:          {summary['ticks']}")
+    print(f"ticks/sec:      {summary['ticks_per_sec']:.0f}")
+    print(f"wall/game:      {summary['wall_time_per_game'] * 1000:.1f} ms")
+    print(f"mean length:    {summary['mean_length']:.1f}")
+    print("length:         " + "  ".join(f"{k}={v:.0f}" for k, v in lengths.items()))
+    print("death causes:   " + "  ".join(f"{k}={v}" for k, v in sorted(summary['causes'].items())))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=20, help="number of games to play")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--max-ticks', type=int, default=20000,
+                        help="stop a game after this many moves")
+    parser.add_argument('--strategy', choices=config['ai']['strategies'],
+                        help="AI strategy (defaults to the configured one)")
+    parser.add_argument('--particles', action='store_true',
+                        help="simulate particles as well")
+    parser.add_argument('--baseline', help="JSON baseline to compare against")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="allowed regression in percent")
+    parser.add_argument('--save-baseline', help="write this run's summary as a baseline")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    game_config = make_config(args.strategy, args.particles)
+
+    results = [
+        run_game(game_config, seed, args.max_ticks)
+        for seed in range(args.seed, args.seed + args.games)
+    ]
+    summary = summarize(results)
+    print_summary(summary)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"compared with {args.baseline}:")
+        regressions = compare(summary, baseline, args.threshold)
+        if regressions:
+            print("REGRESSION: " + ", ".join(regressions))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
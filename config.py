@@ -1,4 +1,7 @@
-config = {
+from observable_config import ObservableConfig
+
+# Sections are ObservableConfig dicts: each has a version bumped on change
+config = ObservableConfig({
     # Display
     'display': {
         'width': 1600,
@@ -51,7 +54,22 @@ config = {
             'head': 1.0,
             'body': 0.95
         },
-        'z_fighting_offset': 0.02
+        'z_fighting_offset': 0.02,
+        'lod': {
+            'chunk_size': 16,  # Cells per edge of a culling chunk
+            'point_pixels': 3.0  # Chunks drawn as points below this segment size on screen
+        }
+    },
+    
+    # AI
+    'ai': {
+        'strategy': 'greedy',
+        'strategies': ['greedy', 'astar', 'lookahead', 'hamiltonian'],
+        'plan_budget_ms': 5.0,
+        'lookahead_budget_ms': 4.0,  # Rollout time per frame, shared by its moves
+        'lookahead_depth': 32,  # Moves per rollout
+        'hamiltonian_cache_dir': 'cache',  # Precomputed cycle tables
+        'hamiltonian_max_fill': 0.5  # No shortcuts once the snake covers this much (at most 0.5)
     },
     
     # Food
@@ -59,12 +77,19 @@ config = {
         'color': (1.0, 0.0, 0.0),
         'size': 0.8,
         'bob_speed': 0.05,
-        'bob_amplitude': 0.2
+        'bob_amplitude': 0.2,
+        'lod': {
+            # Sphere slices/stacks used below each camera distance
+            'distances': [150, 300],
+            'detail': [32, 16, 8]
+        }
     },
     
     # Particles
     'particles': {
         'enabled': True,
+        'capacity': 131072,
+        'max_live': 32768,  # Faintest particles are evicted past this
         'count': 30,
         'min_count': 10,
         'max_count': 100,
@@ -82,20 +107,66 @@ config = {
     
     # Grid
     'grid': {
-        'size': 25,
         'color': (0.2, 0.2, 0.2),
         'enabled': True
     },
     
+    # Simulation
+    'simulation': {
+        'max_ticks_per_frame': 64,  # Snake moves caught up per frame at most
+        'max_physics_steps_per_frame': 8
+    },
+    
+    # Reinforcement learning environment (game/env.py)
+    'env': {
+        'relative_actions': False,  # 5 turns relative to heading instead of 6 directions
+        'max_steps': 20000,  # Episode is truncated after this many moves
+        'rewards': {
+            'food': 1.0,
+            'death': -1.0,
+            'victory': 10.0,
+            'step': 0.0
+        }
+    },
+    
+    # Replays (game/replay.py)
+    'replay': {
+        'record': False,  # Same as running main.py --record
+        'directory': '.',
+        'keyframe_interval': 4096  # Moves between full-state keyframes
+    },
+    
     # Gameplay
     'gameplay': {
-        'boundary': 24,
+        'boundary': 24,  # Largest cell coordinate; the camera scales with it
         'reset_on_collision': True
     },
     
+    # Profiler
+    'profiler': {
+        'enabled': False,
+        'history': 600,  # Frames kept in the ring buffer
+        'export_dir': '.'
+    },
+    
+    # Adaptive quality (game/quality.py)
+    'quality': {
+        'adaptive': True,  # Lower detail when frames overrun the display.fps budget
+        'fixed_level': 3,  # Level held when not adaptive, 0 (minimal) to 3 (full)
+        'headroom': 0.9,  # Step down once frames take this share of the budget
+        'recovery': 0.6,  # Step up once they take less than this share
+        'down_frames': 30,  # Frames in a row over headroom before stepping down
+        'up_frames': 240,  # Frames in a row under recovery before stepping up
+        'cooldown_frames': 60,  # Frames ignored after a change while it settles
+        # Set by the governor and multiplied into the user's settings where used
+        'particle_scale': 1.0,  # particles.count and particles.max_live
+        'sphere_scale': 1.0,  # food.lod.detail
+        'point_scale': 1.0  # snake.lod.point_pixels
+    },
+    
     # Effects
     'effects': {
         'gradient_fade': True,
         'smooth_camera': True,
     }
-}
\ No newline at end of file
+})
@@ -0,0 +1,127 @@
+import random
+import numpy as np
+
+class FreeCells:
+    """Index of the empty cells of the cubic arena with O(1) updates and O(side²) sampling
+
+    Cells are numbered linearly by ``position + boundary`` in x, y, z order
+    and ``bits`` holds one bit per cell, set where a cell is taken, in
+    np.packbits order (the first cell is the high bit of byte 0), so even a
+    255^3 arena needs about 2 MB. ``slab_free`` counts the free cells of each
+    x slab, so occupying or releasing a cell is O(1) and sampling the k-th
+    free cell unpacks one slab, O(side²) (about 0.1 ms at boundary 127).
+    Which cell a given random number selects only depends on which cells
+    are taken, not on the order they were taken in, so a state rebuilt from
+    the body samples exactly like the original.
+
+    copy() shares the arrays until either index changes, at which point the
+    changing one takes a private copy, so ``bits`` may be a new array after a
+    copy() was made.
+    """
+
+    def __init__(self, boundary):
+        """Start with every cell of the arena free
+
+        Args:
+            boundary (int): Largest absolute coordinate of a cell
+        """
+        self.boundary = boundary
+        self.side = 2 * boundary + 1
+        self.slab_size = self.side * self.side
+        self.cell_count = self.side ** 3
+        self.count = self.cell_count
+        self.bits = np.zeros((self.cell_count + 7) // 8, dtype=np.uint8)
+        self._bytes = memoryview(self.bits)  # Plain int access for single cells
+        self.slab_free = np.full(self.side, self.slab_size, dtype=np.int64)
+        self._shared = False
+
+    def __len__(self):
+        return self.count
+
+    def copy(self):
+        """Copy-on-write copy of the index"""
+        other = FreeCells.__new__(FreeCells)
+        other.__dict__.update(self.__dict__)
+        self._shared = other._shared = True
+        return other
+
+    def _unshare(self):
+        self.bits = self.bits.copy()
+        self._bytes = memoryview(self.bits)
+        self.slab_free = self.slab_free.copy()
+        self._shared = False
+
+    def index(self, position):
+        """Linear cell index of a position, or None if it lies outside the arena"""
+        b, side = self.boundary, self.side
+        x, y, z = position
+        if abs(x) > b or abs(y) > b or abs(z) > b:
+            return None
+        return ((x + b) * side + (y + b)) * side + (z + b)
+
+    def position(self, index):
+        """Inverse of index()"""
+        b, side = self.boundary, self.side
+        rest, z = divmod(int(index), side)
+        x, y = divmod(rest, side)
+        return (x - b, y - b, z - b)
+
+    def _taken(self, cell):
+        return self._bytes[cell >> 3] & (0x80 >> (cell & 7))
+
+    def is_free(self, position):
+        cell = self.index(position)
+        return cell is not None and not self._taken(cell)
+
+    def occupy(self, position):
+        """Remove a cell from the free set; no-op if outside or already taken"""
+        cell = self.index(position)
+        if cell is None or self._taken(cell):
+            return
+        if self._shared:
+            self._unshare()
+        self._bytes[cell >> 3] |= 0x80 >> (cell & 7)
+        self.slab_free[cell // self.slab_size] -= 1
+        self.count -= 1
+
+    def release(self, position):
+        """Return a cell to the free set; no-op if outside or already free"""
+        cell = self.index(position)
+        if cell is None or not self._taken(cell):
+            return
+        if self._shared:
+            self._unshare()
+        self._bytes[cell >> 3] &= ~(0x80 >> (cell & 7)) & 0xFF
+        self.slab_free[cell // self.slab_size] += 1
+        self.count += 1
+
+    def grid(self):
+        """Unpacked (side, side, side) uint8 copy, 1 where a cell is taken"""
+        return np.unpackbits(self.bits, count=self.cell_count).reshape((self.side,) * 3)
+
+    def nth_free(self, rank):
+        """Linear index of the free cell with the given rank in cell order"""
+        totals = np.cumsum(self.slab_free)
+        slab = int(np.searchsorted(totals, rank, side='right'))
+        if slab:
+            rank -= int(totals[slab - 1])
+        start = slab * self.slab_size
+        offset = start & 7
+        slab_bits = np.unpackbits(
+            self.bits[start >> 3:(start + self.slab_size + 7) >> 3]
+        )[offset:offset + self.slab_size]
+        free = np.flatnonzero(slab_bits == 0)
+        return start + int(free[rank])
+
+    def random_cell(self, rng=random):
+        """Pick a uniformly random free cell
+
+        Args:
+            rng: Object with a ``randrange`` method (defaults to the random module)
+
+        Returns:
+            tuple: (x, y, z) of the cell, or None when the arena is full
+        """
+        if self.count == 0:
+            return None
+        return self.position(self.nth_free(rng.randrange(self.count)))
@@ -0,0 +1,292 @@
+import random
+import numpy as np
+from game.pathfinding import DIRECTIONS
+
+DIRECTION_ARRAY = np.array(DIRECTIONS, dtype=np.int64)
+
+# The two remaining axes for each primary axis, in ascending order
+OTHER_AXES = np.array([(1, 2), (0, 2), (0, 1)])
+
+CAUSE_NONE, CAUSE_WALL, CAUSE_SELF, CAUSE_VICTORY = range(4)
+CAUSES = (None, 'wall', 'self', 'victory')
+
+# Bit-packed grids keep one bit per cell in np.packbits order
+
+def _test_bits(bits, games, cells):
+    return ((bits[games, cells >> 3] >> (7 - (cells & 7))) & 1).astype(bool)
+
+def _set_bits(bits, games, cells):
+    bits[games, cells >> 3] |= (0x80 >> (cells & 7)).astype(np.uint8)
+
+def _clear_bits(bits, games, cells):
+    bits[games, cells >> 3] &= ~(0x80 >> (cells & 7)).astype(np.uint8)
+
+class BatchSnakeEngine:
+    """Steps many independent games at once with NumPy
+
+    Every per-game quantity is a row of a batch array: head position,
+    direction, a ring-buffered body indexed by move number, a bit-packed
+    occupancy grid and the same bit-packed free-cell grid and per-slab free
+    counts FreeCells uses. One step() advances all games together and dead
+    games restart immediately.
+
+    The rules, the greedy AI, the free-cell bookkeeping and the per-game
+    ``random.Random(seed)`` food sampling mirror Snake and GameState
+    operation for operation, so a game here plays out exactly like a scalar
+    GameState with the same seed and the greedy strategy. Memory is about
+    32 KB per game in the default arena, mostly the two occupancy grids.
+    """
+
+    def __init__(self, batch_size, seeds=None, boundary=24, capacity=1024):
+        """
+        Args:
+            batch_size (int): Number of games
+            seeds (list, optional): One food seed per game, defaults to 0..B-1
+            boundary (int): Largest coordinate food and the AI use
+            capacity (int): Initial ring buffer length per game, doubled on demand
+        """
+        if seeds is None:
+            seeds = range(batch_size)
+        seeds = list(seeds)
+        if len(seeds) != batch_size:
+            raise ValueError("Need exactly one seed per game")
+
+        self.batch_size = batch_size
+        self.games = np.arange(batch_size)
+        self.rngs = [random.Random(seed) for seed in seeds]
+
+        # Food and the AI stay within the boundary; heads die past wall
+        self.boundary = boundary
+        self.wall = boundary + 1
+        self.side = 2 * boundary + 1
+        self.wall_side = 2 * self.wall + 1
+        cell_count = self.side ** 3
+
+        self.occupied = np.zeros((batch_size, (self.wall_side ** 3 + 7) // 8), dtype=np.uint8)
+        self.slab_size = self.side * self.side
+        self.free_bits = np.zeros((batch_size, (cell_count + 7) // 8), dtype=np.uint8)
+        self.slab_free = np.zeros((batch_size, self.side), dtype=np.int64)
+        self.free_count = np.zeros(batch_size, dtype=np.int64)
+
+        self.capacity = capacity
+        self.body = np.zeros((batch_size, capacity, 3), dtype=np.int16)
+        self.steps = np.zeros(batch_size, dtype=np.int64)
+        self.lengths = np.zeros(batch_size, dtype=np.int64)
+        self.heads = np.zeros((batch_size, 3), dtype=np.int64)
+        self.directions = np.zeros((batch_size, 3), dtype=np.int64)
+        self.foods = np.zeros((batch_size, 3), dtype=np.int64)
+        self.grow = np.zeros(batch_size, dtype=bool)
+        self.episodes = np.zeros(batch_size, dtype=np.int64)
+
+        for game in range(batch_size):
+            self.reset_game(game)
+
+    # Cell indexing
+
+    def _free_index(self, positions):
+        """FreeCells cell index and in-range mask, positions shape (..., 3)"""
+        b, side = self.boundary, self.side
+        inside = (np.abs(positions) <= b).all(axis=-1)
+        shifted = np.clip(positions, -b, b) + b
+        index = (shifted[..., 0] * side + shifted[..., 1]) * side + shifted[..., 2]
+        return index, inside
+
+    def _wall_index(self, positions):
+        """Occupancy bitmap index and in-wall mask, positions shape (..., 3)"""
+        w, side = self.wall, self.wall_side
+        inside = (np.abs(positions) <= w).all(axis=-1)
+        shifted = np.clip(positions, -w, w) + w
+        index = (shifted[..., 0] * side + shifted[..., 1]) * side + shifted[..., 2]
+        return index, inside
+
+    def _free_position(self, cell):
+        b, side = self.boundary, self.side
+        rest, z = divmod(int(cell), side)
+        x, y = divmod(rest, side)
+        return (x - b, y - b, z - b)
+
+    # Free-cell bookkeeping, vectorized FreeCells.occupy/release
+
+    def _free_occupy(self, games, cells):
+        taken = _test_bits(self.free_bits, games, cells)
+        games, cells = games[~taken], cells[~taken]
+        _set_bits(self.free_bits, games, cells)
+        self.slab_free[games, cells // self.slab_size] -= 1
+        self.free_count[games] -= 1
+
+    def _free_release(self, games, cells):
+        taken = _test_bits(self.free_bits, games, cells)
+        games, cells = games[taken], cells[taken]
+        _clear_bits(self.free_bits, games, cells)
+        self.slab_free[games, cells // self.slab_size] += 1
+        self.free_count[games] += 1
+
+    def _spawn_food(self, game):
+        """GameState.spawn_food for one game; None when its arena is full"""
+        count = int(self.free_count[game])
+        if count == 0:
+            return None
+        # FreeCells.nth_free on this game's row
+        rank = self.rngs[game].randrange(count)
+        totals = np.cumsum(self.slab_free[game])
+        slab = int(np.searchsorted(totals, rank, side='right'))
+        if slab:
+            rank -= int(totals[slab - 1])
+        start = slab * self.slab_size
+        offset = start & 7
+        slab_bits = np.unpackbits(
+            self.free_bits[game, start >> 3:(start + self.slab_size + 7) >> 3]
+        )[offset:offset + self.slab_size]
+        free = np.flatnonzero(slab_bits == 0)
+        return self._free_position(start + free[rank])
+
+    # Game lifecycle
+
+    def reset_game(self, game):
+        """Start a fresh game in one slot, continuing that game's RNG"""
+        self.occupied[game] = 0
+        self.free_bits[game] = 0
+        self.slab_free[game] = self.slab_size
+        self.free_count[game] = self.side ** 3
+
+        origin = np.zeros((1, 3), dtype=np.int64)
+        self.steps[game] = 0
+        self.lengths[game] = 1
+        self.body[game, 0] = 0
+        self.heads[game] = 0
+        self.directions[game] = (1, 0, 0)
+        self.grow[game] = False
+
+        wall_index, _ = self._wall_index(origin)
+        _set_bits(self.occupied, game, wall_index[0])
+        free_index, _ = self._free_index(origin)
+        self._free_occupy(np.array([game]), free_index)
+
+        self.foods[game] = self._spawn_food(game)
+
+    def _ensure_capacity(self, needed):
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        body = np.zeros((self.batch_size, capacity, 3), dtype=np.int16)
+        for game in range(self.batch_size):
+            serials = np.arange(self.steps[game] - self.lengths[game] + 1, self.steps[game] + 1)
+            body[game, serials % capacity] = self.body[game, serials % self.capacity]
+        self.body = body
+        self.capacity = capacity
+
+    def body_of(self, game):
+        """Body cells of one game, head first, as an (n, 3) array"""
+        serials = np.arange(self.steps[game], self.steps[game] - self.lengths[game], -1)
+        return self.body[game, serials % self.capacity].astype(np.int64)
+
+    # AI
+
+    def _open(self, positions):
+        """Inside the food boundary and not covered by the body"""
+        wall_index, _ = self._wall_index(positions)
+        inside = (np.abs(positions) <= self.boundary).all(axis=-1)
+        games = self.games.reshape((-1,) + (1,) * (positions.ndim - 2))
+        return inside & ~_test_bits(self.occupied, games, wall_index)
+
+    def greedy_moves(self):
+        """GameState.get_greedy_move for every game at once"""
+        heads, current, foods = self.heads, self.directions, self.foods
+        games = self.games
+
+        ahead = heads + current
+        closer = ((ahead - foods) ** 2).sum(axis=1) < ((heads - foods) ** 2).sum(axis=1)
+        keep_course = self._open(ahead) & closer
+
+        food_direction = foods - heads
+        primary = np.argmax(np.abs(food_direction), axis=1)
+        first_axis, second_axis = OTHER_AXES[primary, 0], OTHER_AXES[primary, 1]
+
+        candidates = np.zeros((self.batch_size, 5, 3), dtype=np.int64)
+        candidates[games, 0, primary] = np.where(food_direction[games, primary] > 0, 1, -1)
+        candidates[games, 1, first_axis] = 1
+        candidates[games, 2, first_axis] = -1
+        candidates[games, 3, second_axis] = 1
+        candidates[games, 4, second_axis] = -1
+
+        reverse = (candidates == -current[:, None, :]).all(axis=2)
+        valid = self._open(heads[:, None, :] + candidates) & ~reverse
+        chosen = np.where(
+            valid.any(axis=1)[:, None],
+            candidates[games, np.argmax(valid, axis=1)],
+            current
+        )
+        return np.where(keep_course[:, None], current, chosen)
+
+    # Stepping
+
+    def step(self, actions=None):
+        """Advance every game by one move
+
+        Args:
+            actions (np.ndarray, optional): Per-game direction indices into
+                DIRECTIONS, shape (B,), or direction vectors, shape (B, 3).
+                Defaults to the greedy AI.
+
+        Returns:
+            tuple: ``(ate, done, causes, final_lengths)`` arrays of shape (B,).
+                causes holds CAUSE_* codes and final_lengths the length a
+                finished game ended with; finished games are already reset.
+        """
+        if actions is None:
+            moves = self.greedy_moves()
+        else:
+            moves = np.asarray(actions, dtype=np.int64)
+            if moves.ndim == 1:
+                moves = DIRECTION_ARRAY[moves]
+        games = self.games
+        self.directions = moves
+        new_heads = self.heads + moves
+
+        # Pop tails of games that are not growing, as Snake.move does first
+        popping = games[~self.grow]
+        tail_serials = self.steps[popping] - self.lengths[popping] + 1
+        tails = self.body[popping, tail_serials % self.capacity].astype(np.int64)
+        wall_index, _ = self._wall_index(tails)
+        _clear_bits(self.occupied, popping, wall_index)
+        free_index, inside = self._free_index(tails)
+        self._free_release(popping[inside], free_index[inside])
+        self.lengths[popping] -= 1
+        self.grow[:] = False
+
+        # Push heads
+        wall_index, in_wall = self._wall_index(new_heads)
+        self_collision = in_wall & _test_bits(self.occupied, games, wall_index)
+        self._ensure_capacity(int(self.lengths.max()) + 1)
+        self.steps += 1
+        self.lengths += 1
+        self.body[games, self.steps % self.capacity] = new_heads
+        _set_bits(self.occupied, games[in_wall], wall_index[in_wall])
+        free_index, inside = self._free_index(new_heads)
+        self._free_occupy(games[inside], free_index[inside])
+        self.heads = new_heads
+
+        # Food, sampled per game from its own RNG exactly like GameState
+        ate = (new_heads == self.foods).all(axis=1)
+        victory = np.zeros(self.batch_size, dtype=bool)
+        for game in np.flatnonzero(ate):
+            self.grow[game] = True
+            food = self._spawn_food(game)
+            if food is None:
+                victory[game] = True
+            else:
+                self.foods[game] = food
+
+        causes = np.full(self.batch_size, CAUSE_NONE, dtype=np.int64)
+        causes[~in_wall] = CAUSE_WALL
+        causes[self_collision] = CAUSE_SELF
+        causes[victory] = CAUSE_VICTORY
+        done = causes != CAUSE_NONE
+
+        final_lengths = np.where(done, self.lengths, 0)
+        for game in np.flatnonzero(done):
+            self.episodes[game] += 1
+            self.reset_game(game)
+        return ate, done, causes, final_lengths
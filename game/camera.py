@@ -1,16 +1,33 @@
 import math
-from OpenGL.GLU import gluLookAt
+from OpenGL.GLU import gluLookAt, gluPerspective
+
+# Arena the camera settings in config are tuned for
+DEFAULT_BOUNDARY = 24
 
 def clamp(value, min_value, max_value):
     return max(min(value, max_value), min_value)
 
+def arena_scale(config):
+    """Size of the configured arena relative to the default one"""
+    return (config['gameplay']['boundary'] + 1) / (DEFAULT_BOUNDARY + 1)
+
+def perspective_parameters(config):
+    """(fov, near, far) of the projection, far plane scaled to the arena size"""
+    camera = config['camera']
+    return camera['fov'], camera['near_plane'], camera['far_plane'] * arena_scale(config)
+
+def set_perspective(config, aspect_ratio):
+    """Multiply in the projection for the configured camera"""
+    fov, near, far = perspective_parameters(config)
+    gluPerspective(fov, aspect_ratio, near, far)
+
 class Camera:
     def __init__(self, config):
         self.config = config
         # Camera angles
         self.yaw = 0.0     # Horizontal rotation (0-360°)
         self.pitch = 0.0   # Vertical rotation (±90°)
-        self.radius = config['camera'].get('distance', 100)
+        self.radius = config['camera'].get('distance', 100) * arena_scale(config)
         
         # Movement physics
         self.rotation_velocity_yaw = 0.0
@@ -21,6 +38,7 @@ class Camera:
         self.time = 0.0
         self.pitch_speed = 0.001
         self.disable_auto_spin = False
+        self.settings_version = None  # config['camera'] version last read
 
     def update(self):
         if self._has_momentum():
@@ -56,18 +74,26 @@ class Camera:
         self.rotation_velocity_yaw = delta_yaw
         self.rotation_velocity_pitch = delta_pitch
 
+    def apply_settings(self):
+        """Re-read the auto spin settings after the camera config changed"""
+        camera = self.config['camera']
+        self.settings_version = camera.version
+        self.auto_rotate = camera['auto_rotate']
+        self.spin_speed_yaw = camera['rotation_speed']['x']
+        self.amplitude = camera['y_amplitude']
+
     def auto_spin(self):
-        if not self.config['camera']['auto_rotate']:
+        if self.config['camera'].version != self.settings_version:
+            self.apply_settings()
+        if not self.auto_rotate:
             return
             
         # Update horizontal rotation
-        spin_speed_yaw = self.config['camera']['rotation_speed']['x']
-        self.yaw = (self.yaw + spin_speed_yaw) % (2 * math.pi)
+        self.yaw = (self.yaw + self.spin_speed_yaw) % (2 * math.pi)
         
         # Update vertical oscillation
         self.time += self.pitch_speed
-        amplitude = self.config['camera']['y_amplitude']
-        target_pitch = math.sin(self.time) * amplitude
+        target_pitch = math.sin(self.time) * self.amplitude
         self.pitch = self.pitch * 0.95 + target_pitch * 0.05
 
     def setup_view(self, display):
@@ -0,0 +1,96 @@
+import time
+import numpy as np
+
+def hue_to_rgb(hue):
+    """Fully saturated, full value colour of a hue in [0, 1)"""
+    h = hue * 6.0
+    x = 1.0 - abs(h % 2 - 1)
+    if h < 1: return (1.0, x, 0.0)
+    if h < 2: return (x, 1.0, 0.0)
+    if h < 3: return (0.0, 1.0, x)
+    if h < 4: return (0.0, x, 1.0)
+    if h < 5: return (x, 0.0, 1.0)
+    return (1.0, 0.0, x)
+
+class SnakePalette:
+    """Per-segment snake colours, built with NumPy and cached
+
+    Shared by the renderer and the death animation so both agree on every
+    segment's colour. Colours are only rebuilt when ``key`` changes, that is
+    when the colour settings' version does or, for modes that depend on
+    them, the hue or the length. The default head and body pattern does not
+    depend on the length and is extended as the snake grows, while custom
+    and gamer mode colours fade along the body. In gamer mode the hue is
+    read from the clock once per ``advance()`` (once per frame), not once
+    per segment.
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config (ObservableConfig): Game configuration, whose section
+                versions say when the colour settings changed
+        """
+        self.config = config
+        self.hue = 0.0
+        self.mode = None
+        self.settings_version = None  # config['snake']['colors'] version last read
+        self.key = None  # Changes whenever the colour of any segment does
+        self.colors = np.zeros((0, 3), dtype=np.float32)
+
+    def _apply_settings(self):
+        colors = self.config['snake']['colors']
+        if colors.version == self.settings_version:
+            return
+        self.settings_version = colors.version
+        if colors['gamer_mode']:
+            self.mode = 'gamer'
+        elif colors['custom_color']:
+            self.mode = 'custom'
+        else:
+            self.mode = 'pattern'
+
+    def advance(self, now=None):
+        """Move the gamer mode hue to the given time (seconds, default now)"""
+        self._apply_settings()
+        if self.mode == 'gamer':
+            now = time.time() if now is None else now
+            self.hue = (now * self.config['snake']['colors']['gamer_speed']) % 1.0
+
+    def _key(self, length):
+        if self.mode == 'gamer':
+            return (self.settings_version, self.hue, length)
+        if self.mode == 'custom':
+            return (self.settings_version, length)
+        return (self.settings_version,)
+
+    def _build(self, length):
+        colors = self.config['snake']['colors']
+        if self.mode == 'pattern':
+            # Room to grow into before the pattern needs extending again
+            size = max(length, 2 * len(self.colors), 64)
+            pattern = np.asarray(colors['default_colors']['body_pattern'], dtype=np.float32)
+            built = pattern[np.arange(size) % len(pattern)]
+            built[0] = colors['default_colors']['head']
+            return built
+        rgb = hue_to_rgb(self.hue) if self.mode == 'gamer' else colors['primary_color']
+        fade = 1.0 - np.arange(length, dtype=np.float32) * (colors['gradient_intensity'] / length)
+        return np.clip(np.outer(fade, np.asarray(rgb, dtype=np.float32)), 0.0, 1.0)
+
+    def segment_colors(self, length):
+        """Colours of the first ``length`` segments, head first
+
+        Returns:
+            np.ndarray: Read-only view of shape (length, 3), float32
+        """
+        self._apply_settings()
+        key = self._key(length)
+        if key != self.key or len(self.colors) < length:
+            self.colors = self._build(length)
+            self.colors.flags.writeable = False
+            self.key = key
+        return self.colors[:length]
+
+    def segment_color(self, index, length):
+        """Colour of one segment of a snake of ``length`` segments"""
+        return tuple(self.segment_colors(length)[index].tolist())
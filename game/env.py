@@ -0,0 +1,190 @@
+"""Gym-style reinforcement learning environment around GameState
+
+    env = SnakeEnv(seed=0)
+    observation = env.reset()
+    observation, reward, terminated, truncated, info = env.step(action)
+
+Observations are read-only NumPy views of live simulation state and are
+updated in place by every step, so nothing is copied per step; copy them if
+an agent needs to keep an old observation. Run this module for a reference
+random agent that reports steps per second:
+
+    python -m game.env --steps 100000
+"""
+import argparse
+import copy
+import sys
+import time
+import numpy as np
+from config import config as default_config
+from observable_config import ObservableConfig
+from game.game_state import GameState
+from game.pathfinding import DIRECTIONS
+
+# Forward first, then the four perpendicular turns in DIRECTIONS order
+RELATIVE_MOVES = {
+    heading: (heading,) + tuple(
+        move for move in DIRECTIONS
+        if move != heading and move != tuple(-c for c in heading)
+    )
+    for heading in DIRECTIONS
+}
+
+def _read_only(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+class SnakeEnv:
+    """Single snake driven one move per step() at simulation speed
+
+    Actions are indices into DIRECTIONS (6 absolute moves) or, with relative
+    actions, into RELATIVE_MOVES of the current heading (0 keeps going, 1-4
+    turn). The observation is a dict:
+
+    - ``grid``: bit-packed occupancy of the arena, one bit per cell in
+      np.packbits order; ``np.unpackbits(grid, count=side ** 3)`` reshaped to
+      (side, side, side) is indexed by ``position + boundary``
+    - ``head`` and ``food``: (3,) int64 cell coordinates
+    """
+
+    def __init__(self, game_config=None, seed=None, relative_actions=None,
+                 rewards=None, max_steps=None):
+        """
+        Args:
+            game_config (dict, optional): Base configuration, defaults to config.config
+            seed (int, optional): Seed for food placement
+            relative_actions (bool, optional): Overrides env.relative_actions
+            rewards (dict, optional): Overrides individual env.rewards entries
+            max_steps (int, optional): Overrides env.max_steps
+        """
+        self.config = ObservableConfig(copy.deepcopy(game_config or default_config))
+        self.config['particles']['enabled'] = False
+        env_config = self.config['env']
+        self.relative_actions = (
+            env_config['relative_actions'] if relative_actions is None else relative_actions
+        )
+        self.rewards = dict(env_config['rewards'], **(rewards or {}))
+        self.max_steps = env_config['max_steps'] if max_steps is None else max_steps
+        self.action_count = 5 if self.relative_actions else len(DIRECTIONS)
+
+        self.game_state = GameState(self.config, seed=seed)
+        self._head = np.zeros(3, dtype=np.int64)
+        self._food = np.zeros(3, dtype=np.int64)
+        self.observation = None
+        self._grid_source = None  # FreeCells.bits array the grid view is of
+        self.done = True
+
+    def _sync(self):
+        snake = self.game_state.snake
+        self._head[:] = snake.body[0]
+        if self.game_state.food is not None:
+            self._food[:] = self.game_state.food
+        # Copy-on-write after a clone() gives FreeCells a new bits array
+        bits = self.game_state.free_cells.bits
+        if bits is not self._grid_source:
+            self._grid_source = bits
+            self.observation['grid'] = _read_only(bits)
+
+    def reset(self):
+        """Start a new episode, continuing the food RNG
+
+        Returns:
+            dict: The observation views. ``head`` and ``food`` stay valid
+                for the whole episode; ``grid`` is replaced in this dict
+                whenever the occupancy array is, so read it from the latest
+                observation rather than keeping the view
+        """
+        self.game_state.reset()
+        self.observation = {
+            'grid': None,  # Set by _sync()
+            'head': _read_only(self._head),
+            'food': _read_only(self._food)
+        }
+        self._grid_source = None
+        self._sync()
+        self.done = False
+        return self.observation
+
+    def step(self, action):
+        """Make one move
+
+        Args:
+            action (int): Index into DIRECTIONS, or into the relative moves
+
+        Returns:
+            tuple: (observation, reward, terminated, truncated, info)
+        """
+        if self.done:
+            raise RuntimeError("Episode is over, call reset() first")
+
+        snake = self.game_state.snake
+        if self.relative_actions:
+            move = RELATIVE_MOVES[snake.direction][action]
+        else:
+            move = DIRECTIONS[action]
+
+        alive = self.game_state.tick(move)
+        self._sync()
+
+        reward = self.rewards['step']
+        if snake.grow:  # Set by tick() only when food was eaten
+            reward += self.rewards['food']
+        terminated = not alive
+        if terminated:
+            cause = self.game_state.death_cause
+            reward += self.rewards['victory' if cause == 'victory' else 'death']
+        truncated = not terminated and snake.steps >= self.max_steps
+        self.done = terminated or truncated
+
+        info = {
+            'length': len(snake.body),
+            'steps': snake.steps,
+            'cause': self.game_state.death_cause
+        }
+        return self.observation, reward, terminated, truncated, info
+
+def run_random_agent(env, steps, seed=None):
+    """Drive env with uniformly random actions for a number of steps
+
+    Returns:
+        dict: steps, episodes, mean episode reward and steps per second
+    """
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, env.action_count, steps)
+    episodes = []
+    episode_reward = 0.0
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        _, reward, terminated, truncated, _ = env.step(int(action))
+        episode_reward += reward
+        if terminated or truncated:
+            episodes.append(episode_reward)
+            episode_reward = 0.0
+            env.reset()
+    elapsed = time.perf_counter() - start
+    return {
+        'steps': steps,
+        'episodes': len(episodes),
+        'mean_reward': float(np.mean(episodes)) if episodes else 0.0,
+        'steps_per_sec': steps / elapsed if elapsed > 0 else 0.0
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Random agent steps/sec on SnakeEnv")
+    parser.add_argument('--steps', type=int, default=100000, help="environment steps to run")
+    parser.add_argument('--seed', type=int, default=0, help="seed for food and actions")
+    parser.add_argument('--relative', action='store_true', help="use relative actions")
+    args = parser.parse_args(argv)
+
+    env = SnakeEnv(seed=args.seed, relative_actions=args.relative or None)
+    stats = run_random_agent(env, args.steps, args.seed)
+    print(f"steps:          {stats['steps']}")
+    print(f"episodes:       {stats['episodes']}")
+    print(f"mean reward:    {stats['mean_reward']:.2f}")
+    print(f"steps/sec:      {stats['steps_per_sec']:.0f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import math
+import numpy as np
+
+def perspective_matrix(fov, aspect_ratio, near, far):
+    """The matrix gluPerspective multiplies in, for column vectors"""
+    f = 1.0 / math.tan(math.radians(fov) / 2.0)
+    return np.array([
+        [f / aspect_ratio, 0.0, 0.0, 0.0],
+        [0.0, f, 0.0, 0.0],
+        [0.0, 0.0, (far + near) / (near - far), 2.0 * far * near / (near - far)],
+        [0.0, 0.0, -1.0, 0.0]
+    ])
+
+def look_at_matrix(eye, target=(0.0, 0.0, 0.0), up=(0.0, 1.0, 0.0)):
+    """The matrix gluLookAt multiplies in, for column vectors"""
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = np.asarray(target, dtype=np.float64) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    true_up = np.cross(side, forward)
+    matrix = np.identity(4)
+    matrix[0, :3], matrix[1, :3], matrix[2, :3] = side, true_up, -forward
+    matrix[:3, 3] = -matrix[:3, :3] @ eye
+    return matrix
+
+class Frustum:
+    """View volume of a perspective camera, for culling axis-aligned boxes
+
+    Planes are extracted from the combined projection and view matrix, so
+    the volume matches what the GL pipeline clips exactly. The focal length
+    in pixels converts world sizes at a distance into on-screen sizes.
+    """
+
+    def __init__(self, matrix, eye, focal_pixels):
+        """
+        Args:
+            matrix (np.ndarray): 4x4 projection @ view matrix
+            eye (tuple): Camera position
+            focal_pixels (float): Pixels a unit length covers at distance 1
+        """
+        rows = np.asarray(matrix, dtype=np.float64)
+        planes = np.array([
+            rows[3] + rows[0], rows[3] - rows[0],  # left, right
+            rows[3] + rows[1], rows[3] - rows[1],  # bottom, top
+            rows[3] + rows[2], rows[3] - rows[2]   # near, far
+        ])
+        self.normals = planes[:, :3]
+        self.offsets = planes[:, 3]
+        self.eye = np.asarray(eye, dtype=np.float64)
+        self.focal_pixels = focal_pixels
+
+    @classmethod
+    def from_camera(cls, eye, fov, aspect_ratio, near, far, viewport_height):
+        """Frustum of a camera at eye looking at the origin with +y up"""
+        matrix = perspective_matrix(fov, aspect_ratio, near, far) @ look_at_matrix(eye)
+        focal_pixels = viewport_height / (2.0 * math.tan(math.radians(fov) / 2.0))
+        return cls(matrix, eye, focal_pixels)
+
+    def boxes_visible(self, mins, maxs):
+        """Which boxes intersect the frustum, conservatively
+
+        Args:
+            mins, maxs (np.ndarray): Box corners, shape (n, 3)
+
+        Returns:
+            np.ndarray: Boolean mask of shape (n,)
+        """
+        # Per plane, the corner furthest along its normal must be inside
+        furthest = np.where(self.normals[None, :, :] > 0, maxs[:, None, :], mins[:, None, :])
+        distances = (furthest * self.normals[None, :, :]).sum(axis=2) + self.offsets
+        return (distances >= 0).all(axis=1)
+
+    def box_distances(self, mins, maxs):
+        """Distance from the eye to the nearest point of each box"""
+        outside = np.maximum(np.maximum(mins - self.eye, self.eye - maxs), 0.0)
+        return np.sqrt((outside ** 2).sum(axis=1))
+
+    def pixel_size(self, size, distance):
+        """On-screen pixels covered by a length seen face-on at a distance"""
+        return size * self.focal_pixels / np.maximum(distance, 1e-6)
@@ -1,38 +1,160 @@
 import random
 import math
+from itertools import islice
 from snake import Snake
+from free_cells import FreeCells
+from game.colors import SnakePalette
+from game.hamiltonian import HamiltonianCycle, HamiltonianPlanner, excluded_cell
+from game.lookahead import LookaheadPlanner
+from game.pathfinding import AStarPlanner
+from game.quality import particle_burst_count, particle_limit
+from game.snapshot import GameSnapshot
+from game.timestep import FixedTimestep
+from observable_config import ObservableConfig
 from particle_system import ParticleSystem
 
+# Shared by every clone: they never emit, so it stays empty
+_NO_PARTICLES = ParticleSystem(0)
+
 class GameState:
-    def __init__(self, config):
+    def __init__(self, config, seed=None):
+        """
+        Args:
+            config (ObservableConfig): Game configuration. A plain dict is
+                copied into one, since settings are re-read by section
+                version; change that copy through ``game_state.config``.
+            seed (int, optional): Seed for food placement; identical seeds
+                and AI choices replay identical games
+        """
+        if not isinstance(config, ObservableConfig):
+            config = ObservableConfig(config)
         self.config = config
+        self.rng = random.Random(seed)
+        self._rng_shared = False  # rng is shared with a clone until either draws
+        # Food and the AI stay within the boundary, the head dies past it
+        self.boundary = config['gameplay']['boundary']
+        self.pathfinder = AStarPlanner(self.boundary, config['ai']['plan_budget_ms'])
+        self.lookahead = LookaheadPlanner(
+            self.boundary, config['ai']['lookahead_budget_ms'], config['ai']['lookahead_depth']
+        )
+        simulation = config['simulation']
+        self.move_clock = FixedTimestep(config['snake']['speed'], simulation['max_ticks_per_frame'])
+        self.physics_clock = FixedTimestep(
+            1000.0 / config['display']['fps'], simulation['max_physics_steps_per_frame']
+        )
+        self.last_update_time = None
+        self.recorder = None  # ReplayRecorder capturing this game, if any
+        self.move_source = None  # Callable replacing the AI, used by replays
+        self.effects = True  # Emit particles; off for clones
+        self.hamiltonian = None  # Loaded on first use
+        # Whether the cell off the Hamiltonian cycle is out of play. Part of the
+        # game state: it follows the strategy setting, except in replays
+        self.corner_reserved = config['ai']['strategy'] == 'hamiltonian'
+        self.palette = SnakePalette(config)  # Shared with the renderer
         self.reset()
+        self.apply_settings()
         
     def reset(self):
-        self.snake = Snake()
-        self.food = self.spawn_food(self.snake.body)
+        self.free_cells = self.new_free_cells()
+        self.snake = Snake(self.free_cells, wall=self.boundary + 1)
+        self.victory = False
+        self.death_cause = None
+        self.food = self.spawn_food(self.snake)
+        self.pathfinder.invalidate()
         self.game_speed = self.config['snake']['speed']
-        self.last_move_time = 0
+        self.move_clock.reset()
         self.food_bob_time = 0
-        self.particle_system = ParticleSystem()
+        if self.effects:
+            self.particle_system = ParticleSystem(
+                self.config['particles']['capacity'], particle_limit(self.config)
+            )
+        else:
+            self.particle_system = _NO_PARTICLES
         self.dying = False
         self.death_animation_segment = 0
         self.last_death_effect = 0
         self.death_complete = False
         self.death_complete_time = 0
         self.death_speed = 250
-        self.food_collected = False
         self.last_food_pos = None
+        if self.recorder is not None:
+            self.recorder.record_reset()
         
-    def spawn_food(self, snake_body):
-        while True:
-            x = random.randint(-24, 24)
-            y = random.randint(-24, 24)
-            z = random.randint(-24, 24)
-            if (x, y, z) not in snake_body:
-                return (x, y, z)
+    def new_free_cells(self):
+        """Empty free-cell index, with the cell off the Hamiltonian cycle
+        taken out while the corner is reserved"""
+        free_cells = FreeCells(self.boundary)
+        if self.corner_reserved:
+            free_cells.occupy(excluded_cell(self.boundary))
+        return free_cells
+
+    def reserve_corner(self, reserve):
+        """Take the cell off the Hamiltonian cycle out of play, or return it
+
+        Used when the strategy changes mid-game. Food already lying in the
+        corner stays there, so the switch draws nothing from the food RNG;
+        the Hamiltonian strategy hands such food to A*. A body covering the
+        corner keeps it until the tail leaves, when tick() reserves it again.
+        A recording keyframes the change so replays can follow it.
+        """
+        self.corner_reserved = reserve
+        corner = excluded_cell(self.boundary)
+        if not self.snake.is_occupied(corner):
+            if reserve:
+                self.free_cells.occupy(corner)
+            else:
+                self.free_cells.release(corner)
+        if self.recorder is not None:
+            self.recorder.record_corner()
+
+    def spawn_food(self, snake):
+        """Place food on a random empty cell
+
+        Costs O(side²): FreeCells unpacks the one x slab of its occupancy
+        bits that holds the chosen cell. Returns None once the snake covers
+        every cell of the arena.
+        """
+        if self._rng_shared:
+            self._unshare_rng()
+        return snake.free_cells.random_cell(self.rng)
+
+    def _unshare_rng(self):
+        rng = random.Random(0)
+        rng.setstate(self.rng.getstate())
+        self.rng = rng
+        self._rng_shared = False
     
     def get_next_move(self):
+        """Pick the next direction using the configured AI strategy"""
+        if self.move_source is not None:
+            return self.move_source()
+        if self.config['ai']['strategy'] == 'astar':
+            self.pathfinder.budget_ms = self.config['ai']['plan_budget_ms']
+            move = self.pathfinder.next_move(self.snake, self.food)
+            if move is not None:
+                return move
+        elif self.config['ai']['strategy'] == 'hamiltonian':
+            if self.hamiltonian is None:
+                cycle = HamiltonianCycle.load(self.boundary, self.config['ai']['hamiltonian_cache_dir'])
+                self.hamiltonian = HamiltonianPlanner(cycle)
+            self.hamiltonian.max_fill = self.config['ai']['hamiltonian_max_fill']
+            move = self.hamiltonian.next_move(self.snake, self.food)
+            if move is None:
+                # Off the cycle (food in the reserved corner, or the body
+                # left the cycle after a strategy switch)
+                move = self.pathfinder.next_move(self.snake, self.food)
+            if move is not None:
+                return move
+        elif self.config['ai']['strategy'] == 'lookahead':
+            self.lookahead.budget_ms = self.config['ai']['lookahead_budget_ms']
+            self.lookahead.depth = self.config['ai']['lookahead_depth']
+            move = self.lookahead.next_move(self)
+            if move is not None:
+                return move
+        return self.get_greedy_move()
+
+    def get_greedy_move(self):
+        """Head straight for the food, avoiding walls and the body one step ahead"""
         head = self.snake.body[0]
         current_direction = self.snake.direction
         
@@ -48,8 +170,9 @@ class GameState:
             head[2] + current_direction[2]
         )
         
-        if (abs(new_pos[0]) <= 24 and abs(new_pos[1]) <= 24 and 
-            abs(new_pos[2]) <= 24 and new_pos not in self.snake.body):
+        b = self.boundary
+        if (abs(new_pos[0]) <= b and abs(new_pos[1]) <= b and 
+            abs(new_pos[2]) <= b and not self.snake.is_occupied(new_pos)):
             current_distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(new_pos, self.food)))
             head_distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(head, self.food)))
             if current_distance < head_distance:
@@ -78,107 +201,250 @@ class GameState:
         for move in possible_moves:
             new_pos = tuple(head[i] + move[i] for i in range(3))
             
-            if (abs(new_pos[0]) <= 24 and abs(new_pos[1]) <= 24 and 
-                abs(new_pos[2]) <= 24 and new_pos not in self.snake.body):
+            if (abs(new_pos[0]) <= b and abs(new_pos[1]) <= b and 
+                abs(new_pos[2]) <= b and not self.snake.is_occupied(new_pos)):
                 return move
         
         return current_direction
 
     def update(self, current_time):
-        # Update game speed from config in case it changed
-        self.game_speed = self.config['snake']['speed']
+        """Advance the simulation to current_time (milliseconds)
+
+        Snake moves run on a fixed timestep of game_speed milliseconds and
+        particles on one of 1/fps seconds, each as many times as the elapsed
+        time owes (bounded per frame), independent of the render rate.
+        """
+        if self.config.version != self.settings_version:
+            self.apply_settings()
+        
+        if self.last_update_time is None:
+            self.last_update_time = current_time
+        elapsed = current_time - self.last_update_time
+        self.last_update_time = current_time
         
         # Update particles regardless of game state
-        if self.config['particles']['enabled']:
-            self.particle_system.update(1.0/self.config['display']['fps'])
+        physics_steps = self.physics_clock.advance(elapsed)
+        if self.particles_enabled:
+            for _ in range(physics_steps):
+                self.particle_system.update(self.physics_clock.step / 1000.0)
 
         if self.dying:
-            if current_time - self.last_death_effect >= self.death_speed:
-                if self.death_animation_segment < len(self.snake.body):
-                    if self.config['particles']['enabled']:
-                        segment_index = len(self.snake.body) - 1 - self.death_animation_segment
-                        
-                        # Get the same color as the snake segment
-                        if self.config['snake']['colors']['custom_color']:
-                            r, g, b = self.config['snake']['colors']['primary_color']
-                            intensity = self.config['snake']['colors']['gradient_intensity']
-                            fade = 1.0 - (segment_index/len(self.snake.body)) * intensity
-                            color = [max(0.0, min(1.0, c * fade)) for c in (r, g, b)]
-                        else:
-                            if segment_index == 0:
-                                color = self.config['snake']['colors']['default_colors']['head']
-                            else:
-                                pattern = self.config['snake']['colors']['default_colors']['body_pattern']
-                                color = pattern[segment_index % len(pattern)]
-
-                        for _ in range(self.config['particles']['count']):
-                            velocity = [
-                                random.uniform(-15, 15),
-                                random.uniform(5, 20),
-                                random.uniform(-15, 15)
-                            ]
-                            self.particle_system.emit_particle(
-                                position=self.snake.body[segment_index],
-                                velocity=velocity,
-                                color=color,
-                                lifetime=random.uniform(0.5, 1.5)
-                            )
-                    
-                    # Progress death animation regardless of particles
-                    self.death_speed = max(50, 500 - (self.death_animation_segment * 25))
-                    self.death_animation_segment += 1
-                    self.last_death_effect = current_time
-                elif not self.death_complete:
-                    self.death_complete = True
-                    self.death_complete_time = current_time
-                elif current_time - self.death_complete_time >= 3000:  # 3 second wait
-                    self.reset()
-                    return True
+            self.update_death_sequence(current_time)
             return True
 
-        # Original update logic for live snake
-        if current_time - self.last_move_time >= self.game_speed:
-            next_move = self.get_next_move()
-            self.snake.move(next_move)
-            
-            if self.snake.body[0] == self.food:
-                # Store food position before spawning new food
-                if self.config['particles']['enabled']:
-                    self.last_food_pos = self.food
-                    self.food_collected = True
-                self.snake.grow = True
-                self.food = self.spawn_food(self.snake.body)
-            
-            if self.snake.check_collision():
-                self.dying = True
-                return True
-                
-            self.last_move_time = current_time
+        self.move_clock.step = self.game_speed
+        moves = self.move_clock.advance(elapsed)
+        self.lookahead.begin_frame(moves)
+        for _ in range(moves):
+            if not self.tick():
+                break
+        self.lookahead.end_frame()
+        if self.dying:
+            return True
             
         # Update food bobbing using config speed
-        self.food_bob_time += self.config['food']['bob_speed']
+        self.food_bob_time += self.config['food']['bob_speed'] * physics_steps
+        
+        return True
+
+    def apply_settings(self):
+        """Re-read the config values update() uses; only needed once it changed"""
+        self.settings_version = self.config.version
+        hamiltonian = self.config['ai']['strategy'] == 'hamiltonian'
+        # A replay reserves the corner as the recording did, not as the viewer's strategy would
+        if self.move_source is None and hamiltonian != self.corner_reserved:
+            self.reserve_corner(hamiltonian)
+        self.game_speed = self.config['snake']['speed']
+        self.particles_enabled = self.config['particles']['enabled']
+        self.burst_count = particle_burst_count(self.config)
+        self.physics_clock.step = 1000.0 / self.config['display']['fps']
+        if self.effects:
+            self.particle_system.limit = particle_limit(self.config)
+
+    def tick(self, move=None):
+        """Move the snake one cell
+
+        Args:
+            move (tuple, optional): Direction to take instead of asking the AI
+
+        Returns:
+            bool: False once the snake has died or filled the arena
+        """
+        next_move = move if move is not None else self.get_next_move()
+        if next_move is None:
+            # A replay has no move for this tick
+            return True
+        if self.recorder is not None:
+            self.recorder.record_move(next_move)
+        self.snake.move(next_move)
+        if self.corner_reserved and self.snake.last_tail == excluded_cell(self.boundary):
+            self.free_cells.occupy(self.snake.last_tail)
+        
+        if self.snake.body[0] == self.food:
+            self.last_food_pos = self.food
+            if self.effects and self.particles_enabled:
+                particles = self.config['particles']
+                self.particle_system.emit_burst(
+                    [self.food], self.burst_count, (1.0, 0.0, 0.0),
+                    speed=(particles['speed']['min'], particles['speed']['max']),
+                    lifetime=(particles['lifetime']['min'], particles['lifetime']['max']),
+                    color_variation=particles['color_variation']
+                )
+            self.snake.grow = True
+            self.food = self.spawn_food(self.snake)
+            if self.food is None:
+                # Snake fills the whole arena
+                self.victory = True
+                self.death_cause = 'victory'
+                self.dying = True
+                return False
+        
+        if self.snake.check_collision():
+            self.death_cause = 'self' if self.snake.self_collision else 'wall'
+            self.dying = True
+            return False
         
         return True
 
+    def update_death_sequence(self, current_time):
+        """Burst the body into particles segment by segment, then restart"""
+        if current_time - self.last_death_effect >= self.death_speed:
+            if self.death_animation_segment < len(self.snake.body):
+                if self.effects and self.particles_enabled:
+                    segment_index = len(self.snake.body) - 1 - self.death_animation_segment
+                    # Same colour the renderer gives the segment
+                    color = self.palette.segment_color(segment_index, len(self.snake.body))
+                    self.particle_system.emit_burst(
+                        [self.snake.body[segment_index]], self.burst_count, color,
+                        lifetime=(0.5, 1.5), velocity_box=((-15, 5, -15), (15, 20, 15))
+                    )
+                
+                # Progress death animation regardless of particles
+                self.death_speed = max(50, 500 - (self.death_animation_segment * 25))
+                self.death_animation_segment += 1
+                self.last_death_effect = current_time
+            elif not self.death_complete:
+                self.death_complete = True
+                self.death_complete_time = current_time
+            elif current_time - self.death_complete_time >= 3000:  # 3 second wait
+                self.reset()
+
+    def snapshot(self):
+        """Capture the simulation state as a GameSnapshot in O(length)"""
+        snake = self.snake
+        return GameSnapshot(
+            body=tuple(snake.body),
+            direction=snake.direction,
+            grow=snake.grow,
+            steps=snake.steps,
+            self_collision=snake.self_collision,
+            last_tail=snake.last_tail,
+            food=self.food,
+            rng_state=self.rng.getstate(),
+            food_bob_time=self.food_bob_time,
+            move_accumulator=self.move_clock.accumulator,
+            physics_accumulator=self.physics_clock.accumulator,
+            last_update_time=self.last_update_time,
+            dying=self.dying,
+            victory=self.victory,
+            death_cause=self.death_cause,
+            death_animation_segment=self.death_animation_segment,
+            last_death_effect=self.last_death_effect,
+            death_complete=self.death_complete,
+            death_complete_time=self.death_complete_time,
+            death_speed=self.death_speed,
+            last_food_pos=self.last_food_pos,
+            corner_reserved=self.corner_reserved
+        )
+
+    def restore(self, snapshot):
+        """Return to a snapshot in O(length); particles are left alone"""
+        self.corner_reserved = snapshot.corner_reserved
+        self.free_cells = self.new_free_cells()
+        snake = Snake(self.free_cells, snapshot.body, self.boundary + 1)
+        snake.direction = snapshot.direction
+        snake.grow = snapshot.grow
+        snake.steps = snapshot.steps
+        snake.self_collision = snapshot.self_collision
+        snake.last_tail = snapshot.last_tail
+        self.snake = snake
+
+        self.food = snapshot.food
+        if self._rng_shared:
+            self._unshare_rng()
+        self.rng.setstate(snapshot.rng_state)
+        self.food_bob_time = snapshot.food_bob_time
+        self.move_clock.accumulator = snapshot.move_accumulator
+        self.physics_clock.accumulator = snapshot.physics_accumulator
+        self.last_update_time = snapshot.last_update_time
+        self.dying = snapshot.dying
+        self.victory = snapshot.victory
+        self.death_cause = snapshot.death_cause
+        self.death_animation_segment = snapshot.death_animation_segment
+        self.last_death_effect = snapshot.last_death_effect
+        self.death_complete = snapshot.death_complete
+        self.death_complete_time = snapshot.death_complete_time
+        self.death_speed = snapshot.death_speed
+        self.last_food_pos = snapshot.last_food_pos
+        self.pathfinder.invalidate()
+
+    def clone(self):
+        """Independent copy for simulating hypothetical futures
+
+        The body, free-cell index and food RNG are shared copy-on-write, so
+        a clone costs O(1) until it first moves. Clones share the config, start
+        with an empty AI plan, record nothing and emit no particles.
+        """
+        other = GameState.__new__(GameState)
+        other.__dict__.update(self.__dict__)
+        self._rng_shared = other._rng_shared = True
+        other.free_cells = self.free_cells.copy()
+        other.snake = self.snake.copy(other.free_cells)
+        other.pathfinder = AStarPlanner(self.pathfinder.boundary, self.pathfinder.budget_ms)
+        other.move_clock = self.move_clock.copy()
+        other.physics_clock = self.physics_clock.copy()
+        other.particle_system = _NO_PARTICLES
+        other.recorder = None
+        other.move_source = None
+        other.effects = False
+        return other
+
+    def kill(self):
+        """End the current game on request, starting the death sequence"""
+        if not self.dying:
+            if self.recorder is not None:
+                self.recorder.record_kill()
+            self.death_cause = 'killed'
+            self.dying = True
+
+    def grow_snake(self):
+        """Make the snake grow on its next move"""
+        if self.dying:
+            return
+        if self.recorder is not None:
+            self.recorder.record_grow()
+        self.snake.grow = True
+
+    def get_interpolation_alpha(self):
+        """How far rendering is between the previous and the current tick"""
+        if self.dying:
+            return 1.0
+        return self.move_clock.alpha
+
     def get_food_position(self):
+        if self.food is None:
+            return None
         bob_speed = self.config['food']['bob_speed']
         bob_amplitude = self.config['food']['bob_amplitude']
         bob_offset = math.sin(self.food_bob_time) * bob_amplitude
         return (self.food[0], self.food[1] + bob_offset, self.food[2])
 
+    def get_visible_count(self):
+        """Number of segments, counted from the head, still drawn"""
+        return len(self.snake.body) - (self.death_animation_segment if self.dying else 0)
+
     def get_visible_segments(self):
         if not self.dying:
             return self.snake.body
         # Return all segments except the ones that have been destroyed
-        return self.snake.body[:(len(self.snake.body) - self.death_animation_segment)]
-
-def draw(self):
-    if self.config['particles']['enabled']:
-        self.particle_system.draw()
-        if self.food_collected:
-            self.particle_system.emit_particles(
-                position=self.last_food_pos, 
-                color=[1.0, 0.0, 0.0],
-                count=self.config['particles']['count']
-            )
-            self.food_collected = False
\ No newline at end of file
+        return list(islice(self.snake.body, len(self.snake.body) - self.death_animation_segment))
@@ -0,0 +1,284 @@
+"""Hamiltonian cycle over the arena and an AI that follows it with shortcuts
+
+The arena is a cube with an odd side, so it has an odd number of cells and,
+being bipartite, no Hamiltonian cycle. The cycle therefore covers every cell
+except the corner (-b, -b, -b), which FreeCells keeps reserved in this mode.
+
+Cycles are built once per arena size and cached on disk as two int32 arrays
+indexed by linear cell index (the FreeCells numbering): ``successor`` (next
+cell on the cycle) and ``order`` (position along the cycle), both -1 for the
+excluded corner. Later runs memory-map the cache instead of rebuilding it.
+
+    python -m game.hamiltonian --boundary 24
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from game.pathfinding import DIRECTIONS
+
+CACHE_VERSION = 2
+
+def excluded_cell(boundary):
+    """The one cell the cycle leaves out"""
+    return (-boundary, -boundary, -boundary)
+
+def _comb_cycle(width, height):
+    """Cycle through a width x height grid (height even) as (a, b) pairs
+
+    Rows are swept back and forth over a = 1..width-1 and column a = 0 is
+    the way back, so every row b contains the edges (a, b)-(a+1, b) for
+    a = 1..width-2.
+    """
+    path = [(0, 0)]
+    for b in range(height):
+        columns = range(1, width) if b % 2 == 0 else range(width - 1, 0, -1)
+        path.extend((a, b) for a in columns)
+    path.extend((0, b) for b in range(height - 1, 0, -1))
+    return path
+
+def generate_cycle(boundary):
+    """Build the cycle for an arena
+
+    With u, v, w the x, y, z coordinates shifted to 0..side-1:
+
+    1. The w = 0 layer minus its corner: a comb over rows v = 1..side-1, with
+       the row v = 0 cells spliced in pairwise between (u, 1) and (u+1, 1).
+    2. Every u slice of the w >= 1 box: a comb over v and w, odd slices
+       running backwards.
+    3. Neighbouring slices are merged by swapping a pair of antiparallel
+       edges for the two edges between them, alternating rows so each slice
+       keeps the edge the next merge needs. The box joins the layer the
+       same way.
+
+    Everything is built as whole-array operations on the successor table
+    and positions along the cycle are found by pointer jumping, so large
+    arenas need no per-cell Python objects.
+
+    Returns:
+        tuple: (successor, order) int32 arrays
+    """
+    side = 2 * boundary + 1
+    if side < 5:
+        raise ValueError("Arena too small for a Hamiltonian cycle")
+    count = side ** 3
+
+    def index(u, v, w):
+        return (u * side + v) * side + w
+
+    successor = np.full(count, -1, dtype=np.int32)
+    comb = np.array(_comb_cycle(side, side - 1), dtype=np.int32)
+
+    def merge(p, q, p2, q2):
+        """Join the cycles through edge p-q and the reverse edge q2-p2,
+        where p2 and q2 neighbour p and q"""
+        if successor[p] != q:
+            p, q, p2, q2 = q, p, q2, p2
+        if successor[q2] != p2:
+            raise RuntimeError("Hamiltonian cycle merge edges run the same way")
+        successor[p] = p2
+        successor[q2] = q
+
+    # 1. Bottom layer without the corner; row v = 1 runs towards +u
+    layer = index(comb[:, 0], comb[:, 1] + 1, 0)
+    successor[layer] = np.roll(layer, -1)
+    u = np.arange(1, side - 1, 2, dtype=np.int32)
+    successor[index(u, 1, 0)] = index(u, 0, 0)
+    successor[index(u, 0, 0)] = index(u + 1, 0, 0)
+    successor[index(u + 1, 0, 0)] = index(u + 1, 1, 0)
+
+    # 2. One cycle per u slice of the box above it
+    slices = index(np.arange(side, dtype=np.int32)[:, None], comb[None, :, 0], comb[None, :, 1] + 1)
+    successor[slices[0::2]] = np.roll(slices[0::2], -1, axis=1)
+    successor[slices[1::2]] = np.roll(slices[1::2], 1, axis=1)
+
+    # 3. Merge the slices, then the box with the layer
+    for u in range(side - 1):
+        w = 1 if u % 2 == 0 else 2
+        merge(index(u, 1, w), index(u, 2, w), index(u + 1, 1, w), index(u + 1, 2, w))
+    merge(index(0, 3, 0), index(0, 4, 0), index(0, 3, 1), index(0, 4, 1))
+
+    # Position along the cycle from the arena centre: cut the cycle in
+    # front of the centre and count each cell's steps to the cut by
+    # pointer jumping, doubling the jump length every round
+    start = index(boundary, boundary, boundary)
+    corner = index(0, 0, 0)
+    jump = successor.copy()
+    jump[corner] = corner
+    jump[start] = start
+    distance = np.ones(count, dtype=np.int32)
+    distance[corner] = distance[start] = 0
+    for _ in range(int(count).bit_length()):
+        distance += distance[jump]
+        jump = jump[jump]
+    order = ((count - 1 - distance) % (count - 1)).astype(np.int32)
+    order[corner] = -1
+
+    validate_cycle(successor, order, boundary)
+    return successor, order
+
+def validate_cycle(successor, order, boundary):
+    """Check the arrays describe one cycle of unit steps over all but the corner"""
+    side = 2 * boundary + 1
+    count = side ** 3
+    corner = 0  # Linear index of excluded_cell(boundary)
+    cells = np.flatnonzero(successor >= 0).astype(np.int32)
+    if len(cells) != count - 1 or successor[corner] != -1:
+        raise RuntimeError("Cycle does not cover the arena minus its corner")
+    positions = order[cells]
+    seen = np.zeros(count - 1, dtype=bool)
+    seen[positions[(positions >= 0) & (positions < count - 1)]] = True
+    if not seen.all():
+        raise RuntimeError("Cycle order is not a permutation")
+    following = successor[cells]
+    if not np.array_equal((positions + 1) % (count - 1), order[following]):
+        raise RuntimeError("Successors do not follow the cycle order")
+    # A unit step changes the linear index by 1, side or side^2 without
+    # wrapping into the next row or slab
+    step = np.abs(following - cells)
+    adjacent = (
+        ((step == 1) & (following // side == cells // side))
+        | ((step == side) & (following // side ** 2 == cells // side ** 2))
+        | (step == side ** 2)
+    )
+    if not adjacent.all():
+        raise RuntimeError("Cycle contains a step between non-adjacent cells")
+
+def cache_paths(boundary, cache_dir):
+    stem = os.path.join(cache_dir, f"hamiltonian-v{CACHE_VERSION}-{boundary}")
+    return stem + "-successor.npy", stem + "-order.npy"
+
+class HamiltonianCycle:
+    """Successor and order tables of an arena's cycle"""
+
+    def __init__(self, boundary, successor, order):
+        self.boundary = boundary
+        self.side = 2 * boundary + 1
+        # Plain ndarray views skip np.memmap's per-lookup overhead
+        self.successor = successor.view(np.ndarray)
+        self.order = order.view(np.ndarray)
+        self.length = self.side ** 3 - 1
+
+    @classmethod
+    def load(cls, boundary, cache_dir):
+        """Memory-map the cached cycle, generating and caching it first if needed"""
+        successor_path, order_path = cache_paths(boundary, cache_dir)
+        if not (os.path.exists(successor_path) and os.path.exists(order_path)):
+            successor, order = generate_cycle(boundary)
+            os.makedirs(cache_dir, exist_ok=True)
+            for path, array in ((successor_path, successor), (order_path, order)):
+                temporary = path + ".tmp.npy"
+                np.save(temporary, array)
+                os.replace(temporary, path)
+        return cls(
+            boundary,
+            np.load(successor_path, mmap_mode='r'),
+            np.load(order_path, mmap_mode='r')
+        )
+
+    def index(self, position):
+        """Linear cell index, or None outside the arena"""
+        b, side = self.boundary, self.side
+        x, y, z = position
+        if abs(x) > b or abs(y) > b or abs(z) > b:
+            return None
+        return ((x + b) * side + (y + b)) * side + (z + b)
+
+    def position(self, index):
+        b, side = self.boundary, self.side
+        rest, z = divmod(int(index), side)
+        x, y = divmod(rest, side)
+        return (x - b, y - b, z - b)
+
+class HamiltonianPlanner:
+    """Follows the cycle, cutting ahead towards the food when it is safe
+
+    The body always lies on a stretch of the cycle running from the tail
+    forward to the head, and every cell ahead of the head up to the tail is
+    free. A neighbour is therefore taken as a shortcut when it is ahead of
+    the head by less than the tail is, minus a margin and any growth still
+    pending, and not past the food. Each candidate costs two order-table
+    lookups.
+
+    The cells a shortcut skips stay empty until the tail passes them, and
+    food eaten meanwhile uses up the room ahead of the head, so close to a
+    full arena a shortcut can still trap the snake. Shortcuts therefore
+    stop once the snake covers ``max_fill`` of the cycle, capped at
+    MAX_FILL. Food off the cycle can never be reached by following it, so
+    that is left to another planner.
+    """
+
+    SAFETY_MARGIN = 4
+    MAX_FILL = 0.5
+
+    def __init__(self, cycle, max_fill=MAX_FILL):
+        self.cycle = cycle
+        self.max_fill = max_fill
+
+    def next_move(self, snake, food):
+        """
+        Returns:
+            tuple: Direction (x, y, z), or None if the snake or the food is
+                off the cycle
+        """
+        cycle = self.cycle
+        order, length = cycle.order, cycle.length
+        head = snake.body[0]
+        head_index = cycle.index(head)
+        if head_index is None or order[head_index] < 0:
+            return None
+        head_order = int(order[head_index])
+
+        target = cycle.position(cycle.successor[head_index])
+        food_index = cycle.index(food) if food is not None else None
+        if food is not None and (food_index is None or order[food_index] < 0):
+            return None
+        max_fill = min(self.max_fill, self.MAX_FILL)
+        if food_index is not None and len(snake.body) < max_fill * length:
+            food_gap = (int(order[food_index]) - head_order) % length
+            if len(snake.body) > 1:
+                tail_gap = (int(order[cycle.index(snake.body[-1])]) - head_order) % length
+            else:
+                tail_gap = length
+            best_gap = 1
+            hx, hy, hz = head
+            for dx, dy, dz in DIRECTIONS:
+                cell = (hx + dx, hy + dy, hz + dz)
+                cell_index = cycle.index(cell)
+                if cell_index is None or order[cell_index] < 0:
+                    continue
+                gap = (int(order[cell_index]) - head_order) % length
+                if best_gap < gap <= food_gap and gap < tail_gap - self.SAFETY_MARGIN - snake.grow:
+                    best_gap, target = gap, cell
+
+        # Only reachable when the body left the cycle order, e.g. after a
+        # strategy switch mid-game
+        if snake.is_occupied(target) and (target != snake.body[-1] or snake.grow):
+            return None
+        return (target[0] - head[0], target[1] - head[1], target[2] - head[2])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and time the Hamiltonian cycle cache")
+    parser.add_argument('--boundary', type=int, default=24, help="largest cell coordinate")
+    parser.add_argument('--cache-dir', default='cache', help="where the cycle is cached")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    successor, order = generate_cycle(args.boundary)
+    generate_time = time.perf_counter() - start
+    print(f"cells:          {len(order) - 1}")
+    print(f"generate:       {generate_time * 1000:.0f} ms")
+
+    HamiltonianCycle.load(args.boundary, args.cache_dir)
+    start = time.perf_counter()
+    cycle = HamiltonianCycle.load(args.boundary, args.cache_dir)
+    load_time = time.perf_counter() - start
+    print(f"mmap load:      {load_time * 1000:.2f} ms")
+    if not (np.array_equal(cycle.successor, successor) and np.array_equal(cycle.order, order)):
+        print("cache does not match a fresh build, delete it to rebuild")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import random
+import time
+from game.pathfinding import DIRECTIONS
+
+class LookaheadPlanner:
+    """Monte Carlo rollout AI bounded by a time budget
+
+    Every tick the snake is copied once, privately so the live game's
+    copy-on-write state is untouched, and used as a probe: rollouts from
+    each open first move are played with move() and unwound with undo(), so
+    the occupancy set is updated incrementally instead of copied per node.
+    Rollouts follow a food-seeking policy with some random moves, are scored
+    by how soon they reach the food or whether they get trapped, and the
+    first move with the best mean score is played once the budget runs out.
+
+    The budget covers one decision, or one frame between begin_frame() and
+    end_frame(): moves the frame has to catch up on split what is left of it
+    so a slow frame cannot take a full budget per move.
+    """
+
+    CLOCK_CHECK_INTERVAL = 32
+    DISCOUNT = 0.97
+    DEATH_SCORE = -1.0
+
+    def __init__(self, boundary, budget_ms=4.0, depth=32, greedy_bias=0.95, seed=0):
+        """
+        Args:
+            boundary (int): Largest absolute coordinate the snake may move to
+            budget_ms (float): Wall time one decision, or one frame, may take
+            depth (int): Moves per rollout at most
+            greedy_bias (float): Chance a rollout move heads for the food
+            seed (int): Seed of the rollout policy's RNG
+        """
+        self.boundary = boundary
+        self.budget_ms = budget_ms
+        self.depth = depth
+        self.greedy_bias = greedy_bias
+        self.rng = random.Random(seed)
+        self.frame_deadline = None
+        self.frame_moves = 0  # Decisions the current frame still owes
+        self.last_nodes = 0
+        self.last_rollouts = 0
+        self.nodes_per_sec = 0.0
+
+    def _is_open(self, snake, cell):
+        """In bounds and off the body; the tail counts as open unless it stays"""
+        b = self.boundary
+        if abs(cell[0]) > b or abs(cell[1]) > b or abs(cell[2]) > b:
+            return False
+        if cell not in snake.occupied:
+            return True
+        return cell == snake.body[-1] and not snake.grow and len(snake.body) > 1
+
+    def _open_moves(self, snake):
+        hx, hy, hz = snake.body[0]
+        return [
+            move for move in DIRECTIONS
+            if self._is_open(snake, (hx + move[0], hy + move[1], hz + move[2]))
+        ]
+
+    def _policy(self, snake, food):
+        """Mostly a move towards the food, otherwise a random open move"""
+        if self.rng.random() < self.greedy_bias:
+            hx, hy, hz = snake.body[0]
+            dx, dy, dz = food[0] - hx, food[1] - hy, food[2] - hz
+            for move in DIRECTIONS:
+                if move[0] * dx + move[1] * dy + move[2] * dz > 0:
+                    cell = (hx + move[0], hy + move[1], hz + move[2])
+                    if self._is_open(snake, cell):
+                        return move
+        moves = self._open_moves(snake)
+        return self.rng.choice(moves) if moves else None
+
+    def _rollout(self, probe, first_move, food, deadline, nodes):
+        """Play one rollout on probe and unwind it
+
+        Returns:
+            tuple: (score, nodes expanded); score is None if time ran out
+        """
+        history = []
+        score = None
+        move = first_move
+        start_nodes = nodes
+        for step in range(self.depth):
+            history.append((probe.direction, probe.grow, probe.last_tail, probe.self_collision))
+            probe.move(move)
+            nodes += 1
+            if probe.body[0] == food:
+                score = self.DISCOUNT ** step
+                break
+            if nodes % self.CLOCK_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+                break
+            move = self._policy(probe, food)
+            if move is None:
+                score = self.DEATH_SCORE * self.DISCOUNT ** step
+                break
+        else:
+            # Survived without reaching the food; prefer ending up closer to it
+            hx, hy, hz = probe.body[0]
+            distance = abs(food[0] - hx) + abs(food[1] - hy) + abs(food[2] - hz)
+            score = -0.5 * distance / (6 * self.boundary)
+
+        while history:
+            probe.undo(*history.pop())
+        return score, nodes - start_nodes
+
+    def begin_frame(self, moves):
+        """Share one budget between the next ``moves`` decisions"""
+        self.frame_deadline = time.perf_counter() + self.budget_ms / 1000.0
+        self.frame_moves = moves
+
+    def end_frame(self):
+        self.frame_moves = 0
+
+    def next_move(self, game_state):
+        """Best first move found within the budget
+
+        Returns:
+            tuple: Direction (x, y, z), or None if there is no open move or
+                no rollout finished in time
+        """
+        food = game_state.food
+        if food is None:
+            return None
+        start = time.perf_counter()
+        if self.frame_moves:
+            # An even share of what the frame has left
+            deadline = start + max(self.frame_deadline - start, 0.0) / self.frame_moves
+            self.frame_moves -= 1
+            if deadline <= start:
+                self.last_nodes = self.last_rollouts = 0
+                return None
+        else:
+            deadline = start + self.budget_ms / 1000.0
+
+        probe = game_state.snake.private_copy()  # Only the occupancy set is needed
+        candidates = self._open_moves(probe)
+        if len(candidates) <= 1:
+            self.last_nodes = self.last_rollouts = 0
+            return candidates[0] if candidates else None
+
+        totals = [0.0] * len(candidates)
+        counts = [0] * len(candidates)
+        nodes = rollouts = 0
+        while time.perf_counter() < deadline:
+            index = rollouts % len(candidates)
+            # Every candidate of a round sees the same random moves, so their
+            # scores differ by the first move rather than by luck
+            if index == 0:
+                round_state = self.rng.getstate()
+            else:
+                self.rng.setstate(round_state)
+            score, used = self._rollout(probe, candidates[index], food, deadline, nodes)
+            nodes += used
+            if score is None:
+                break
+            totals[index] += score
+            counts[index] += 1
+            rollouts += 1
+
+        elapsed = time.perf_counter() - start
+        self.last_nodes = nodes
+        self.last_rollouts = rollouts
+        if elapsed > 0:
+            self.nodes_per_sec = nodes / elapsed
+
+        scored = [i for i in range(len(candidates)) if counts[i]]
+        if not scored:
+            return None
+        best = max(scored, key=lambda i: totals[i] / counts[i])
+        return candidates[best]
@@ -0,0 +1,138 @@
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+
+def build_sphere(radius, slices, stacks):
+    """UV sphere centred on the origin
+
+    Returns:
+        tuple: (float32 vertices of shape (n, 3), uint32 triangle indices)
+    """
+    theta = np.linspace(0.0, np.pi, stacks + 1, dtype=np.float32)[:, None]
+    phi = np.linspace(0.0, 2.0 * np.pi, slices + 1, dtype=np.float32)[None, :]
+    vertices = np.stack([
+        np.sin(theta) * np.cos(phi),
+        np.sin(theta) * np.sin(phi),
+        np.broadcast_to(np.cos(theta), (stacks + 1, slices + 1))
+    ], axis=-1).reshape(-1, 3) * radius
+
+    row = slices + 1
+    i, j = np.meshgrid(np.arange(stacks), np.arange(slices), indexing='ij')
+    a = (i * row + j).ravel()
+    b = a + row
+    indices = np.stack([a, b, a + 1, a + 1, b, b + 1], axis=-1).ravel()
+    return vertices.astype(np.float32), indices.astype(np.uint32)
+
+def build_grid(size):
+    """Edges of the cube [-size, size]^3 as line-segment vertex pairs"""
+    s = float(size)
+    corners = np.array([
+        (-s, -s, s), (s, -s, s), (s, s, s), (-s, s, s),
+        (-s, -s, -s), (s, -s, -s), (s, s, -s), (-s, s, -s)
+    ], dtype=np.float32)
+    edges = [
+        # Front face
+        0, 1, 1, 2, 2, 3, 3, 0,
+        # Back face
+        4, 5, 5, 6, 6, 7, 7, 4,
+        # Connecting lines
+        4, 0, 5, 1, 6, 2, 7, 3
+    ]
+    return corners[edges]
+
+def build_cube(size):
+    """Cube spanning [-size, size]^3 as triangles
+
+    Returns:
+        tuple: (float32 vertices of shape (8, 3), uint32 triangle indices)
+    """
+    s = float(size)
+    vertices = np.array([
+        (-s, -s, s), (s, -s, s), (s, s, s), (-s, s, s),
+        (-s, -s, -s), (s, -s, -s), (s, s, -s), (-s, s, -s)
+    ], dtype=np.float32)
+    indices = np.array([
+        0, 1, 2, 2, 3, 0,
+        5, 4, 7, 7, 6, 5,
+        1, 5, 6, 6, 2, 1,
+        4, 0, 3, 3, 7, 4,
+        3, 2, 6, 6, 7, 3,
+        4, 5, 1, 1, 0, 4
+    ], dtype=np.uint32)
+    return vertices, indices
+
+class Mesh:
+    """Static geometry held in GPU buffers"""
+
+    def __init__(self, vertices, indices=None, mode=GL_TRIANGLES):
+        self.mode = mode
+        self.vertex_buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        self.index_buffer = None
+        self.count = len(vertices)
+        if indices is not None:
+            self.index_buffer = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            self.count = len(indices)
+
+    def draw(self):
+        """Draw with the current colour and modelview matrix"""
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p(0))
+
+        if self.index_buffer is not None:
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+            glDrawElements(self.mode, self.count, GL_UNSIGNED_INT, ctypes.c_void_p(0))
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        else:
+            glDrawArrays(self.mode, 0, self.count)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def release(self):
+        buffers = [b for b in (self.vertex_buffer, self.index_buffer) if b is not None]
+        glDeleteBuffers(len(buffers), buffers)
+        self.vertex_buffer = self.index_buffer = None
+
+class MeshCache:
+    """Builds static meshes once and keeps them keyed by their parameters"""
+
+    def __init__(self):
+        self.meshes = {}
+
+    def _get(self, key, build):
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            mesh = build()
+            self.meshes[key] = mesh
+        return mesh
+
+    def sphere(self, radius, slices, stacks):
+        return self._get(
+            ('sphere', radius, slices, stacks),
+            lambda: Mesh(*build_sphere(radius, slices, stacks))
+        )
+
+    def grid(self, size):
+        return self._get(('grid', size), lambda: Mesh(build_grid(size), mode=GL_LINES))
+
+    def cube(self, size):
+        return self._get(('cube', size), lambda: Mesh(*build_cube(size)))
+
+    def release(self, key):
+        """Free one cached mesh, e.g. ('sphere', 0.8, 32, 32)"""
+        mesh = self.meshes.pop(key, None)
+        if mesh is not None:
+            mesh.release()
+
+    def release_all(self):
+        for mesh in self.meshes.values():
+            mesh.release()
+        self.meshes.clear()
@@ -0,0 +1,56 @@
+import ctypes
+from OpenGL.GL import *
+
+class ParticleRenderer:
+    """Draws a ParticleSystem from a streamed vertex buffer
+
+    Every frame the buffer is orphaned (reallocated with no data so the driver
+    can hand out fresh storage instead of waiting on the previous draw), the
+    packed particle array is uploaded with a single glBufferSubData call and
+    all particles are drawn with one glDrawArrays call.
+    """
+
+    FLOATS_PER_VERTEX = 7
+    STRIDE = FLOATS_PER_VERTEX * 4
+    COLOR_OFFSET = 3 * 4
+
+    def __init__(self, point_size=5.0):
+        self.point_size = point_size
+        self.buffer = None
+        self.buffer_size = 0
+
+    def draw(self, particle_system):
+        """Upload and draw every live particle"""
+        vertices = particle_system.pack_vertices()
+        count = len(vertices)
+        if count == 0:
+            return
+
+        if self.buffer is None:
+            self.buffer = glGenBuffers(1)
+        self.buffer_size = particle_system.capacity * self.STRIDE
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glBufferData(GL_ARRAY_BUFFER, self.buffer_size, None, GL_STREAM_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
+
+        glPointSize(self.point_size)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+
+        glVertexPointer(3, GL_FLOAT, self.STRIDE, ctypes.c_void_p(0))
+        glColorPointer(4, GL_FLOAT, self.STRIDE, ctypes.c_void_p(self.COLOR_OFFSET))
+        glDrawArrays(GL_POINTS, 0, count)
+
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisable(GL_BLEND)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def release(self):
+        """Free the GPU buffer"""
+        if self.buffer is not None:
+            glDeleteBuffers(1, [self.buffer])
+            self.buffer = None
@@ -0,0 +1,147 @@
+import heapq
+import time
+from collections import deque
+
+DIRECTIONS = (
+    (1, 0, 0), (-1, 0, 0),
+    (0, 1, 0), (0, -1, 0),
+    (0, 0, 1), (0, 0, -1)
+)
+
+class AStarPlanner:
+    """Grid A* pathfinding AI that reuses its planned path across ticks
+
+    A path is planned once per food position and then consumed one step per
+    tick. It is only replanned when the food moves, the snake leaves the
+    planned route, or the next cell on the route turns out to be blocked.
+    Cells on the route were free when it was planned and the body can only
+    cover them by following the route itself, so checking the next cell is
+    enough to keep the cached path valid.
+    """
+
+    CLOCK_CHECK_INTERVAL = 64
+    RETRY_TICKS = 8
+
+    def __init__(self, boundary, budget_ms=5.0):
+        """
+        Args:
+            boundary (int): Largest absolute coordinate the snake may move to
+            budget_ms (float): Wall time a single plan may take before giving up
+        """
+        self.boundary = boundary
+        self.budget_ms = budget_ms
+        self.path = deque()
+        self.target = None
+        self.expected_head = None
+        self.retry_in = 0
+        self.last_expansions = 0
+
+    def invalidate(self):
+        """Drop the cached path so the next tick replans"""
+        self.path.clear()
+        self.target = None
+        self.expected_head = None
+        self.retry_in = 0
+
+    def next_move(self, snake, food):
+        """Return the next direction along the cached path, replanning lazily
+
+        Args:
+            snake (Snake): Snake to steer
+            food (tuple): Target cell
+
+        Returns:
+            tuple: Direction (x, y, z), or None if no path is known this tick
+        """
+        head = snake.body[0]
+        if food is None:
+            return None
+
+        if (food != self.target or head != self.expected_head or not self.path
+                or not self._is_open(snake, self.path[0])):
+            if self.retry_in > 0 and food == self.target:
+                self.retry_in -= 1
+                return None
+            self.target = food
+            self.path = self.plan(snake, head, food)
+            if not self.path:
+                self.expected_head = None
+                self.retry_in = self.RETRY_TICKS
+                return None
+
+        next_cell = self.path.popleft()
+        self.expected_head = next_cell
+        return (next_cell[0] - head[0], next_cell[1] - head[1], next_cell[2] - head[2])
+
+    def _is_open(self, snake, cell):
+        b = self.boundary
+        if abs(cell[0]) > b or abs(cell[1]) > b or abs(cell[2]) > b:
+            return False
+        return not snake.is_occupied(cell) or cell == self._vacating_tail(snake)
+
+    def _vacating_tail(self, snake):
+        """The tail cell if it is freed by the next move, else None"""
+        if snake.grow or len(snake.body) < 2:
+            return None
+        return snake.body[-1]
+
+    def plan(self, snake, start, goal):
+        """Run A* from start to goal around the snake's body
+
+        The tail cell counts as open unless the snake is about to grow, since
+        it is vacated on the next move.
+
+        Returns:
+            deque: Cells to visit after start, empty if no path was found
+                within the time budget
+        """
+        tail = self._vacating_tail(snake)
+        deadline = time.perf_counter() + self.budget_ms / 1000.0
+        b = self.boundary
+        gx, gy, gz = goal
+
+        came_from = {start: None}
+        cost = {start: 0}
+        open_heap = [(0, 0, start)]
+        expansions = 0
+
+        while open_heap:
+            _, neg_g, current = heapq.heappop(open_heap)
+            g = -neg_g
+            if current == goal:
+                break
+            if g > cost[current]:
+                continue
+
+            expansions += 1
+            if (expansions % self.CLOCK_CHECK_INTERVAL == 0
+                    and time.perf_counter() > deadline):
+                self.last_expansions = expansions
+                return deque()
+
+            cx, cy, cz = current
+            for dx, dy, dz in DIRECTIONS:
+                nx, ny, nz = cx + dx, cy + dy, cz + dz
+                if abs(nx) > b or abs(ny) > b or abs(nz) > b:
+                    continue
+                neighbor = (nx, ny, nz)
+                if neighbor != tail and snake.is_occupied(neighbor):
+                    continue
+                new_cost = g + 1
+                if new_cost < cost.get(neighbor, new_cost + 1):
+                    cost[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    h = abs(gx - nx) + abs(gy - ny) + abs(gz - nz)
+                    # Prefer deeper nodes on ties to keep the frontier narrow
+                    heapq.heappush(open_heap, (new_cost + h, -new_cost, neighbor))
+        else:
+            self.last_expansions = expansions
+            return deque()
+
+        self.last_expansions = expansions
+        path = deque()
+        node = goal
+        while node != start:
+            path.appendleft(node)
+            node = came_from[node]
+        return path
@@ -0,0 +1,133 @@
+import csv
+import json
+import time
+from contextlib import nullcontext
+import numpy as np
+
+_DISABLED_STAGE = nullcontext()
+
+class _StageTimer:
+    """Reusable context manager adding its elapsed time to one profiler column"""
+
+    __slots__ = ('profiler', 'column', 'start')
+
+    def __init__(self, profiler, column):
+        self.profiler = profiler
+        self.column = column
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.current[self.column] += time.perf_counter() - self.start
+        return False
+
+class FrameProfiler:
+    """Records per-stage wall time of every frame into a fixed-size ring buffer
+
+    Usage inside the game loop::
+
+        profiler.begin_frame()
+        with profiler.stage('update'):
+            ...
+        profiler.end_frame()
+
+    While disabled, stage() hands back a shared no-op context manager and
+    begin_frame()/end_frame() return immediately, so the instrumentation can
+    stay in the loop permanently.
+    """
+
+    TOTAL = 'frame'
+
+    def __init__(self, stages, history=600, enabled=False):
+        """
+        Args:
+            stages (list): Stage names in loop order
+            history (int): Number of frames kept
+            enabled (bool): Whether to record at all
+        """
+        self.stages = list(stages)
+        self.columns = self.stages + [self.TOTAL]
+        self.history = history
+        self.enabled = enabled
+        self.samples = np.zeros((history, len(self.columns)), dtype=np.float64)
+        self.current = np.zeros(len(self.columns), dtype=np.float64)
+        self.timers = {
+            name: _StageTimer(self, column) for column, name in enumerate(self.stages)
+        }
+        self.frame_start = None
+        self.index = 0
+        self.filled = 0
+
+    def stage(self, name):
+        """Context manager timing one stage of the current frame"""
+        if not self.enabled:
+            return _DISABLED_STAGE
+        return self.timers[name]
+
+    def begin_frame(self):
+        if not self.enabled:
+            self.frame_start = None
+            return
+        self.current[:] = 0.0
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        self.current[-1] = time.perf_counter() - self.frame_start
+        self.samples[self.index] = self.current
+        self.index = (self.index + 1) % self.history
+        self.filled = min(self.filled + 1, self.history)
+        self.frame_start = None
+
+    def clear(self):
+        self.index = 0
+        self.filled = 0
+
+    def recorded(self):
+        """Recorded samples in seconds, oldest frame first, shape (frames, columns)"""
+        if self.filled < self.history:
+            return self.samples[:self.filled]
+        return np.roll(self.samples, -self.index, axis=0)
+
+    def frame_times_ms(self):
+        """Total frame times in milliseconds, oldest first, as float32 for plotting"""
+        return (self.recorded()[:, -1] * 1000.0).astype(np.float32)
+
+    def percentiles(self, points=(50, 95, 99)):
+        """Per-column percentiles in milliseconds
+
+        Returns:
+            dict: column name -> list of values, one per requested percentile
+        """
+        recorded = self.recorded()
+        if len(recorded) == 0:
+            return {}
+        values = np.percentile(recorded, points, axis=0) * 1000.0
+        return {name: values[:, i].tolist() for i, name in enumerate(self.columns)}
+
+    def export_csv(self, path):
+        """Write one row per recorded frame, times in milliseconds"""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + [f'{name}_ms' for name in self.columns])
+            for frame, row in enumerate(self.recorded() * 1000.0):
+                writer.writerow([frame] + [f'{value:.4f}' for value in row])
+
+    def export_json(self, path):
+        """Write percentile summary plus raw per-frame samples in milliseconds"""
+        recorded = self.recorded() * 1000.0
+        data = {
+            'stages': self.columns,
+            'percentiles': {
+                name: dict(zip(('p50', 'p95', 'p99'), values))
+                for name, values in self.percentiles().items()
+            },
+            'frames': {name: recorded[:, i].round(4).tolist()
+                       for i, name in enumerate(self.columns)}
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
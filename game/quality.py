@@ -0,0 +1,131 @@
+import time
+from collections import deque
+
+# Cheapest first. Shares scale the configured particle count, live particle
+# limit and sphere detail, point_scale multiplies the snake's point LOD
+# threshold and ui_interval is how many frames each UI rebuild is reused for.
+QUALITY_LEVELS = (
+    {'name': 'minimal', 'particles': 0.2, 'sphere': 0.25, 'point_scale': 4.0, 'ui_interval': 4},
+    {'name': 'low', 'particles': 0.4, 'sphere': 0.5, 'point_scale': 2.5, 'ui_interval': 3},
+    {'name': 'medium', 'particles': 0.7, 'sphere': 0.75, 'point_scale': 1.5, 'ui_interval': 2},
+    {'name': 'full', 'particles': 1.0, 'sphere': 1.0, 'point_scale': 1.0, 'ui_interval': 1},
+)
+
+MIN_SPHERE_DETAIL = 6
+
+# The governor leaves the user's settings alone and only writes the scales in
+# config['quality']; these combine the two where the values are used
+
+def particle_burst_count(config):
+    """Particles per burst at the current quality"""
+    return max(1, round(config['particles']['count'] * config['quality']['particle_scale']))
+
+def particle_limit(config):
+    """Live particles allowed at the current quality"""
+    return max(1, round(config['particles']['max_live'] * config['quality']['particle_scale']))
+
+def sphere_detail(config):
+    """Food sphere slices/stacks per LOD distance band at the current quality"""
+    scale = config['quality']['sphere_scale']
+    return [
+        max(MIN_SPHERE_DETAIL, round(detail * scale)) for detail in config['food']['lod']['detail']
+    ]
+
+def point_pixels(config):
+    """Snake point LOD threshold at the current quality"""
+    return config['snake']['lod']['point_pixels'] * config['quality']['point_scale']
+
+class QualityGovernor:
+    """Steps rendering quality up and down to hold the target frame rate
+
+    Every frame reports how long its work took (excluding the frame cap's
+    wait). A smoothed frame time above ``headroom`` of the frame budget for
+    ``down_frames`` frames in a row drops one quality level; one below
+    ``recovery`` of the budget for ``up_frames`` frames in a row raises one.
+    The gap between the two thresholds and the wait after each change keep
+    it from oscillating. With ``quality.adaptive`` off the configured fixed
+    level is held instead.
+
+    A level is applied by writing its scales into config['quality'], which
+    the helpers above multiply into the user's own settings where they are
+    used, so the settings sliders keep whatever the user chose.
+    """
+
+    SMOOTHING = 0.1
+    HISTORY = 8
+
+    def __init__(self, config):
+        self.config = config
+        self.level = None
+        self.frame_ms = None
+        self.over_frames = 0
+        self.under_frames = 0
+        self.cooldown = 0
+        self.ui_interval = 1
+        self.changes = deque(maxlen=self.HISTORY)  # (time, level name, reason)
+        quality = config['quality']
+        self.apply(len(QUALITY_LEVELS) - 1 if quality['adaptive'] else quality['fixed_level'],
+                   "start")
+
+    @property
+    def budget_ms(self):
+        return 1000.0 / self.config['display']['fps']
+
+    def apply(self, level, reason):
+        """Switch to a quality level and write its scales into the config"""
+        level = max(0, min(level, len(QUALITY_LEVELS) - 1))
+        if level == self.level:
+            return
+        settings = QUALITY_LEVELS[level]
+        quality = self.config['quality']
+        quality['particle_scale'] = settings['particles']
+        quality['sphere_scale'] = settings['sphere']
+        quality['point_scale'] = settings['point_scale']
+        self.ui_interval = settings['ui_interval']
+
+        self.level = level
+        self.over_frames = self.under_frames = 0
+        self.cooldown = self.config['quality']['cooldown_frames']
+        self.changes.append((time.strftime("%H:%M:%S"), settings['name'], reason))
+
+    def update(self, frame_seconds):
+        """Feed one frame's work time and adjust the level if it is due
+
+        Returns:
+            bool: True if the level changed
+        """
+        quality = self.config['quality']
+        frame_ms = frame_seconds * 1000.0
+        if self.frame_ms is None:
+            self.frame_ms = frame_ms
+        else:
+            self.frame_ms += self.SMOOTHING * (frame_ms - self.frame_ms)
+
+        previous = self.level
+        if not quality['adaptive']:
+            self.apply(quality['fixed_level'], "fixed")
+            return self.level != previous
+
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+
+        budget = self.budget_ms
+        if self.frame_ms > budget * quality['headroom']:
+            self.over_frames += 1
+            self.under_frames = 0
+        elif self.frame_ms < budget * quality['recovery']:
+            self.under_frames += 1
+            self.over_frames = 0
+        else:
+            self.over_frames = self.under_frames = 0
+
+        if self.over_frames >= quality['down_frames'] and self.level > 0:
+            self.apply(self.level - 1, f"{self.frame_ms:.1f} ms > {budget * quality['headroom']:.1f} ms")
+        elif self.under_frames >= quality['up_frames'] and self.level < len(QUALITY_LEVELS) - 1:
+            self.apply(self.level + 1, f"{self.frame_ms:.1f} ms < {budget * quality['recovery']:.1f} ms")
+        return self.level != previous
+
+    @property
+    def level_name(self):
+        return QUALITY_LEVELS[self.level]['name']
@@ -0,0 +1,328 @@
+"""Compact binary game recordings
+
+A replay file is a header followed by records, each a type byte and a
+payload length:
+
+- keyframe: the tick it belongs to, why it was written and a serialized
+  GameSnapshot
+- moves: the first tick and count of a run of 3-bit codes, bit-packed. Codes
+  0-5 index DIRECTIONS, GROW marks a forced growth and KILL a manual kill.
+
+A keyframe is written when recording starts, whenever the game resets or
+reserves or releases the corner cell off the Hamiltonian cycle (a strategy
+switch), and after every ``keyframe_interval`` codes; each moves record
+follows the keyframe it starts from. Ticks count codes from the start of
+the recording.
+Recording only appends small ints on the game thread; packing and file I/O
+happen on a background writer thread.
+"""
+import bisect
+import mmap
+import queue
+import struct
+import threading
+import numpy as np
+from game.pathfinding import DIRECTIONS
+from game.snapshot import GameSnapshot
+
+MAGIC = b'AS3R'
+VERSION = 4
+
+HEADER = struct.Struct('<4sHqH')  # magic, version, seed (-1 if unknown), arena boundary
+RECORD = struct.Struct('<BI')  # record type, payload size
+MOVES_HEADER = struct.Struct('<QI')  # first tick, code count
+KEYFRAME_HEADER = struct.Struct('<QB')  # tick, reason
+
+KEYFRAME_RECORD, MOVES_RECORD = 1, 2
+# Why a keyframe was written
+KEYFRAME_START, KEYFRAME_RESET, KEYFRAME_INTERVAL, KEYFRAME_CORNER = range(4)
+
+GROW, KILL = 6, 7
+DIRECTION_CODES = {move: code for code, move in enumerate(DIRECTIONS)}
+
+# Bit weights turning three unpacked bits back into a code
+_CODE_WEIGHTS = np.array([4, 2, 1], dtype=np.uint8)
+
+def pack_codes(codes):
+    """Pack codes 0-7 into bytes at 3 bits each"""
+    codes = np.asarray(codes, dtype=np.uint8)
+    bits = np.unpackbits(codes[:, None], axis=1)[:, 5:]
+    return np.packbits(bits.reshape(-1)).tobytes()
+
+def unpack_codes(data, count):
+    """Inverse of pack_codes for the first count codes in data"""
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count * 3)
+    return bits.reshape(count, 3) @ _CODE_WEIGHTS
+
+def encode_keyframe(tick, reason, snapshot):
+    return KEYFRAME_HEADER.pack(tick, reason) + snapshot.to_bytes()
+
+def restore_keyframe(game_state, payload):
+    """Overwrite a GameState with a keyframe payload
+
+    Returns:
+        int: The tick the keyframe belongs to
+    """
+    tick, _ = KEYFRAME_HEADER.unpack_from(payload)
+    game_state.restore(GameSnapshot.from_bytes(payload[KEYFRAME_HEADER.size:]))
+    return tick
+
+def apply_code(game_state, code):
+    """Replay one recorded code on a GameState"""
+    if code == GROW:
+        game_state.grow_snake()
+    elif code == KILL:
+        game_state.kill()
+    else:
+        game_state.tick(DIRECTIONS[code])
+
+class ReplayRecorder:
+    """Records a GameState's moves to a replay file as it plays"""
+
+    def __init__(self, path, seed=None, keyframe_interval=4096, boundary=24):
+        """
+        Args:
+            path (str): File to write
+            seed (int, optional): Seed the game was created with, for reference
+            keyframe_interval (int): Codes between periodic keyframes
+            boundary (int): Arena boundary the game is played in
+        """
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.tick = 0
+        self.chunk_start = 0
+        self.pending = []
+        self.game_state = None
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, -1 if seed is None else seed, boundary))
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def attach(self, game_state):
+        """Start recording game_state from its current state"""
+        self.game_state = game_state
+        game_state.recorder = self
+        self._keyframe(KEYFRAME_START)
+
+    def record_move(self, move):
+        self._append(DIRECTION_CODES[move])
+
+    def record_grow(self):
+        self._append(GROW)
+
+    def record_kill(self):
+        self._append(KILL)
+
+    def record_reset(self):
+        """Called after the game resets; starts a new chunk at the new game"""
+        self._keyframe(KEYFRAME_RESET)
+
+    def record_corner(self):
+        """Called after the corner is reserved or released; the keyframe carries the flag"""
+        self._keyframe(KEYFRAME_CORNER)
+
+    def _append(self, code):
+        if len(self.pending) >= self.keyframe_interval:
+            self._keyframe(KEYFRAME_INTERVAL)
+        self.pending.append(code)
+        self.tick += 1
+
+    def _flush_moves(self):
+        if self.pending:
+            self._queue.put((MOVES_RECORD, self.chunk_start, self.pending))
+            self.pending = []
+        self.chunk_start = self.tick
+
+    def _keyframe(self, reason):
+        self._flush_moves()
+        self._queue.put((KEYFRAME_RECORD, self.tick, (reason, self.game_state.snapshot())))
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            kind, tick, data = item
+            if kind == MOVES_RECORD:
+                payload = MOVES_HEADER.pack(tick, len(data)) + pack_codes(data)
+            else:
+                payload = encode_keyframe(tick, *data)
+            self._file.write(RECORD.pack(kind, len(payload)))
+            self._file.write(payload)
+
+    def close(self):
+        """Write what is pending, stop the writer and close the file"""
+        if self.game_state is not None:
+            self._flush_moves()
+            self.game_state.recorder = None
+            self.game_state = None
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+class ReplayReader:
+    """Memory-mapped replay file with keyframe seeking
+
+    Opening scans only record headers. Rebuilding the state at a tick
+    restores the nearest keyframe at or before it and re-simulates at most
+    ``keyframe_interval`` codes.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, seed, boundary = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay")
+        self.seed = None if seed < 0 else seed
+        self.boundary = boundary  # Play back with gameplay.boundary set to this
+
+        self.keyframe_ticks = []
+        self.keyframe_reasons = []
+        self.keyframe_offsets = []
+        self.chunks = {}  # first tick -> (payload offset, code count)
+        self.tick_count = 0
+
+        offset, end = HEADER.size, len(self._map)
+        while offset + RECORD.size <= end:
+            kind, size = RECORD.unpack_from(self._map, offset)
+            payload = offset + RECORD.size
+            if payload + size > end:
+                break  # Truncated by an interrupted recording
+            if kind == KEYFRAME_RECORD:
+                tick, reason = KEYFRAME_HEADER.unpack_from(self._map, payload)
+                self.keyframe_ticks.append(tick)
+                self.keyframe_reasons.append(reason)
+                self.keyframe_offsets.append((payload, size))
+            elif kind == MOVES_RECORD:
+                tick, count = MOVES_HEADER.unpack_from(self._map, payload)
+                self.chunks[tick] = (payload, count)
+                self.tick_count = max(self.tick_count, tick + count)
+            offset = payload + size
+        if not self.keyframe_ticks:
+            raise ValueError(f"{path} has no keyframe")
+
+    def keyframe(self, index):
+        """GameSnapshot stored in the index-th keyframe"""
+        offset, size = self.keyframe_offsets[index]
+        return GameSnapshot.from_bytes(self._map[offset + KEYFRAME_HEADER.size:offset + size])
+
+    def codes(self, start):
+        """Codes of the chunk beginning at tick start (empty if none)"""
+        if start not in self.chunks:
+            return np.zeros(0, dtype=np.uint8)
+        payload, count = self.chunks[start]
+        data = self._map[payload + MOVES_HEADER.size:
+                         payload + MOVES_HEADER.size + (count * 3 + 7) // 8]
+        return unpack_codes(data, count)
+
+    def seek(self, game_state, tick):
+        """Rebuild game_state as it was at a tick
+
+        Returns:
+            int: The tick reached, lower than requested past the recording end
+        """
+        index = max(bisect.bisect_right(self.keyframe_ticks, tick) - 1, 0)
+        offset, size = self.keyframe_offsets[index]
+        start = restore_keyframe(game_state, self._map[offset:offset + size])
+        codes = self.codes(start)[:tick - start]
+        for code in codes:
+            apply_code(game_state, int(code))
+        return start + len(codes)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+class ReplayPlayer:
+    """Feeds a replay into a GameState in place of its AI
+
+    Time passed to update() is scaled by ``speed``, so the snake, the death
+    sequence and the food bob all play back faster or slower together. The
+    corner reservation follows the recording's keyframes, whatever strategy
+    the viewer has selected.
+    """
+
+    def __init__(self, reader, game_state, speed=1.0, start=0):
+        self.reader = reader
+        self.game_state = game_state
+        self.speed = speed
+        self.scaled_time = None
+        self.last_time = None
+        self.tick = reader.seek(game_state, start)
+        self._keyframe = bisect.bisect_right(reader.keyframe_ticks, self.tick)  # Next to follow
+        self._reset_seen = False  # The game restarted since the last reset keyframe
+        # Keyframe timers belong to the recording session's clock
+        game_state.last_update_time = None
+        game_state.move_clock.reset()
+        self._codes_start = None
+        self._codes = None
+        game_state.move_source = self.next_move
+
+    def _peek(self):
+        """Code at the current tick, or None past the end of the recording"""
+        if self._codes_start is None or not (
+                self._codes_start <= self.tick < self._codes_start + len(self._codes)):
+            ticks = self.reader.keyframe_ticks
+            self._codes_start = ticks[max(bisect.bisect_right(ticks, self.tick) - 1, 0)]
+            self._codes = self.reader.codes(self._codes_start)
+        index = self.tick - self._codes_start
+        return int(self._codes[index]) if index < len(self._codes) else None
+
+    @property
+    def finished(self):
+        return self.tick >= self.reader.tick_count
+
+    def _follow_keyframes(self):
+        """Repeat the recording's corner changes up to the current tick
+
+        Several keyframes can share a tick while the game is dying; changes
+        keyframed after a reset wait until the game here has restarted too.
+        """
+        reader = self.reader
+        while (self._keyframe < len(reader.keyframe_ticks)
+               and reader.keyframe_ticks[self._keyframe] <= self.tick):
+            reason = reader.keyframe_reasons[self._keyframe]
+            if reason == KEYFRAME_RESET:
+                if not self._reset_seen:
+                    return
+                self._reset_seen = False
+            elif reason == KEYFRAME_CORNER:
+                reserved = reader.keyframe(self._keyframe).corner_reserved
+                if reserved != self.game_state.corner_reserved:
+                    self.game_state.reserve_corner(reserved)
+            self._keyframe += 1
+
+    def next_move(self):
+        self._follow_keyframes()
+        code = self._peek()
+        while code == GROW:
+            self.game_state.grow_snake()
+            self.tick += 1
+            self._follow_keyframes()
+            code = self._peek()
+        if code is None or code == KILL:
+            return None
+        self.tick += 1
+        return DIRECTIONS[code]
+
+    def update(self, current_time):
+        """Advance playback to current_time (milliseconds of real time)"""
+        if self.last_time is None:
+            self.last_time = self.scaled_time = current_time
+        self.scaled_time += (current_time - self.last_time) * self.speed
+        self.last_time = current_time
+
+        game_state = self.game_state
+        self._follow_keyframes()
+        dying = game_state.dying
+        if not dying:
+            if self._peek() == KILL:
+                self.tick += 1
+                game_state.kill()
+            elif self.finished:
+                return
+        game_state.update(self.scaled_time)
+        if dying and not game_state.dying:
+            self._reset_seen = True
@@ -0,0 +1,45 @@
+from OpenGL.GL import *
+
+def compile_shader(source, shader_type):
+    """Compile a single GLSL shader stage, raising RuntimeError on failure"""
+    shader = glCreateShader(shader_type)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        log = glGetShaderInfoLog(shader)
+        glDeleteShader(shader)
+        raise RuntimeError(f"Shader compilation failed: {log!r}")
+    return shader
+
+def build_program(vertex_source, fragment_source, attributes=()):
+    """Compile and link a shader program
+
+    Args:
+        vertex_source (str): GLSL vertex shader
+        fragment_source (str): GLSL fragment shader
+        attributes (iterable): Attribute names, bound to locations 0, 1, 2...
+            in order before linking
+
+    Returns:
+        int: Program handle
+    """
+    vertex = compile_shader(vertex_source, GL_VERTEX_SHADER)
+    fragment = compile_shader(fragment_source, GL_FRAGMENT_SHADER)
+
+    program = glCreateProgram()
+    glAttachShader(program, vertex)
+    glAttachShader(program, fragment)
+    for location, name in enumerate(attributes):
+        glBindAttribLocation(program, location, name)
+    glLinkProgram(program)
+
+    glDetachShader(program, vertex)
+    glDetachShader(program, fragment)
+    glDeleteShader(vertex)
+    glDeleteShader(fragment)
+
+    if not glGetProgramiv(program, GL_LINK_STATUS):
+        log = glGetProgramInfoLog(program)
+        glDeleteProgram(program)
+        raise RuntimeError(f"Shader link failed: {log!r}")
+    return program
@@ -0,0 +1,533 @@
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from game.shaders import build_program
+
+# Unit cube corners; each segment is an instance of this cube
+CUBE_CORNERS = np.array([
+    (-0.5, -0.5, 0.5), (0.5, -0.5, 0.5),
+    (0.5, 0.5, 0.5), (-0.5, 0.5, 0.5),
+    (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5),
+    (0.5, 0.5, -0.5), (-0.5, 0.5, -0.5)
+], dtype=np.float32)
+
+CUBE_INDICES = np.array([
+    # Front face
+    0, 1, 2, 2, 3, 0,
+    # Back face
+    5, 4, 7, 7, 6, 5,
+    # Right face
+    1, 5, 6, 6, 2, 1,
+    # Left face
+    4, 0, 3, 3, 7, 4,
+    # Top face
+    3, 2, 6, 6, 7, 3,
+    # Bottom face
+    4, 5, 1, 1, 0, 4
+], dtype=np.uint32)
+
+# Serials are stored modulo this so they stay exact as float32
+SERIAL_PERIOD = 1 << 24
+
+# Segment colours are texels of a COLOR_WIDTH wide texture, by segment index
+COLOR_WIDTH = 1024
+
+# GLSL 1.20 with the compatibility matrices, so it runs on Mesa's llvmpipe.
+# The segment index is derived from the serial, so instances never change
+# while their cell stays part of the body.
+INSTANCED_VERTEX_SHADER = """
+#version 120
+attribute vec4 instance;
+attribute vec3 trail;
+attribute vec3 corner;
+uniform float alpha;
+uniform float steps;
+uniform float body_length;
+uniform float visible_count;
+uniform float tail_still;
+uniform float head_scale;
+uniform float color_rows;
+uniform sampler2D colors;
+varying vec3 frag_color;
+
+void main() {
+    float index = steps - instance.w;
+    if (index < 0.0) {
+        index += %(period).1f;
+    }
+    if (index >= visible_count) {
+        // Outside the clip volume, so the death animation hides it
+        gl_Position = vec4(2.0, 2.0, 2.0, 1.0);
+        frag_color = vec3(0.0);
+        return;
+    }
+    vec3 previous = trail;
+    if (tail_still > 0.5 && index >= body_length - 1.0) {
+        previous = instance.xyz;
+    }
+    float scale = index < 0.5 ? head_scale : 1.0;
+    vec3 world = mix(previous, instance.xyz, alpha) + corner * scale;
+
+    float row = floor(index / %(width).1f);
+    vec2 texel = vec2((index - row * %(width).1f + 0.5) / %(width).1f, (row + 0.5) / color_rows);
+    frag_color = texture2DLod(colors, texel, 0.0).rgb;
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(world, 1.0);
+}
+""" % {'period': SERIAL_PERIOD, 'width': COLOR_WIDTH}
+
+INSTANCED_FRAGMENT_SHADER = """
+#version 120
+varying vec3 frag_color;
+
+void main() {
+    gl_FragColor = vec4(frag_color, 1.0);
+}
+"""
+
+# 'instance' stays at location 0: compatibility contexts only draw when
+# attribute 0 is an enabled array, and point chunks leave 'corner' constant
+INSTANCE_ATTRIBUTE, TRAIL_ATTRIBUTE, CORNER_ATTRIBUTE = range(3)
+
+UNIFORMS = (
+    'alpha', 'steps', 'body_length', 'visible_count', 'tail_still',
+    'head_scale', 'color_rows', 'colors'
+)
+
+class SnakeChunk:
+    """Instances of the segments inside one cubic bucket of the arena
+
+    Each instance is ``x, y, z, serial, trail x, trail y, trail z, 0``, where
+    serial is the move that pushed the cell and trail is the cell pushed one
+    move earlier. Slots are packed: removing a segment moves the last one
+    into its slot. Changed slots are uploaded when the chunk is next drawn.
+    """
+
+    INITIAL_CAPACITY = 64
+    INSTANCE_BYTES = 8 * 4
+    # Upload the whole changed range instead of slot by slot past this many
+    MAX_SLOT_UPLOADS = 8
+
+    def __init__(self):
+        self.instances = np.zeros((self.INITIAL_CAPACITY, 8), dtype=np.float32)
+        self.serials = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.count = 0
+        self.buffer = None
+        self.buffer_capacity = 0
+        self.dirty = set()
+        self.stale = False  # Every slot needs uploading
+
+    def reserve(self, count):
+        capacity = len(self.instances)
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        instances = np.zeros((capacity, 8), dtype=np.float32)
+        instances[:self.count] = self.instances[:self.count]
+        serials = np.zeros(capacity, dtype=np.int64)
+        serials[:self.count] = self.serials[:self.count]
+        self.instances, self.serials = instances, serials
+
+    def upload(self):
+        """Bring the GPU buffer up to date with the instances"""
+        if self.buffer is None:
+            self.buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        if self.buffer_capacity != len(self.instances):
+            glBufferData(GL_ARRAY_BUFFER, self.instances.nbytes, self.instances, GL_DYNAMIC_DRAW)
+            self.buffer_capacity = len(self.instances)
+        elif self.stale:
+            rows = self.instances[:self.count]
+            glBufferSubData(GL_ARRAY_BUFFER, 0, rows.nbytes, rows)
+        elif len(self.dirty) <= self.MAX_SLOT_UPLOADS:
+            for slot in self.dirty:
+                row = self.instances[slot]
+                glBufferSubData(GL_ARRAY_BUFFER, slot * self.INSTANCE_BYTES, row.nbytes, row)
+        else:
+            first, last = min(self.dirty), max(self.dirty)
+            rows = self.instances[first:last + 1]
+            glBufferSubData(GL_ARRAY_BUFFER, first * self.INSTANCE_BYTES, rows.nbytes, rows)
+        self.dirty.clear()
+        self.stale = False
+
+    def release(self):
+        if self.buffer is not None:
+            glDeleteBuffers(1, [self.buffer])
+            self.buffer = None
+        self.buffer_capacity = 0
+
+class SnakeMesh:
+    """Snake drawn as instances of one unit cube, bucketed into spatial chunks
+
+    The arena is split into ``chunk_size``-cell cubes and every segment is an
+    instance in the chunk its cell falls in. A move adds the new head to its
+    chunk and swap-removes the old tail from its chunk, so a tick costs a
+    couple of small uploads whatever the length. The segment index (for the
+    colour, the head scale and the death animation) is derived in the shader
+    from the instance's serial and the current move number.
+
+    Each frame, only non-empty chunks whose bounding box intersects the view
+    frustum are drawn: one instanced call each. Chunks whose nearest point is
+    so far away that a segment covers fewer than ``point_pixels`` pixels are
+    drawn as one point per segment instead of a cube.
+
+    Render interpolation mixes each segment from its trail cell, where the
+    segment index it now has was one tick ago, to its own cell. The tail
+    holds still when the last move grew the snake.
+    """
+
+    COLOR_BYTES = 3 * 4
+    HEAD_SCALE = 1.2
+    # Bounding box margin: a trail cell plus the larger head
+    BOX_MARGIN = 1.0 + (HEAD_SCALE - 1.0) / 2
+
+    def __init__(self, palette, capacity=1024, chunk_size=16):
+        """
+        Args:
+            palette (SnakePalette): Source of the per-segment colours
+            capacity (int): Initial number of segments to size lookups for
+            chunk_size (int): Edge length of a chunk in cells
+        """
+        self.palette = palette
+        self.initial_capacity = capacity
+        self.chunk_size = chunk_size
+        self.capacity = 0
+        self.program = None
+        self.cube_buffer = None
+        self.index_buffer = None
+        self.color_texture = None
+        self.color_rows = 0
+        self.colors = None
+        self.snake = None
+        self.steps = 0
+        self.length = 0
+        self.wall = None
+        self.chunks = []
+        self.color_key = None
+        self.colored_count = 0
+        self.last_chunks_drawn = 0
+        self.last_chunks_points = 0
+        self.last_chunks_culled = 0
+
+    def _create_static(self):
+        """Compile the shader and upload the unit cube"""
+        self.program = build_program(
+            INSTANCED_VERTEX_SHADER, INSTANCED_FRAGMENT_SHADER,
+            ('instance', 'trail', 'corner')
+        )
+        self.uniforms = {name: glGetUniformLocation(self.program, name) for name in UNIFORMS}
+        self.cube_buffer, self.index_buffer = glGenBuffers(2)
+        self.color_texture = glGenTextures(1)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.cube_buffer)
+        glBufferData(GL_ARRAY_BUFFER, CUBE_CORNERS.nbytes, CUBE_CORNERS, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, CUBE_INDICES.nbytes, CUBE_INDICES, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    # Chunk grid
+
+    def _layout(self, wall):
+        """Size the chunk grid for an arena whose cells reach +-wall"""
+        self.wall = wall
+        per_axis = -(-(2 * wall + 1) // self.chunk_size)
+        self.chunks_per_axis = per_axis
+        for chunk in self.chunks:
+            if chunk is not None:
+                chunk.release()
+        self.chunks = [None] * per_axis ** 3
+        self.chunk_counts = np.zeros(per_axis ** 3, dtype=np.int64)
+
+        coords = np.stack(np.unravel_index(np.arange(per_axis ** 3), (per_axis,) * 3), axis=1)
+        low = coords * self.chunk_size - wall
+        self.box_min = low - 0.5 - self.BOX_MARGIN
+        self.box_max = low + self.chunk_size - 0.5 + self.BOX_MARGIN
+
+    def _chunk_ids(self, cells):
+        """Chunk index of each cell, cells shape (n, 3)"""
+        coords = np.clip(cells + self.wall, 0, 2 * self.wall) // self.chunk_size
+        n = self.chunks_per_axis
+        return (coords[:, 0] * n + coords[:, 1]) * n + coords[:, 2]
+
+    def _chunk_id(self, cell):
+        wall, size, n = self.wall, self.chunk_size, self.chunks_per_axis
+        x, y, z = (min(max(c + wall, 0), 2 * wall) // size for c in cell)
+        return (x * n + y) * n + z
+
+    def _chunk(self, chunk_id):
+        chunk = self.chunks[chunk_id]
+        if chunk is None:
+            chunk = self.chunks[chunk_id] = SnakeChunk()
+        return chunk
+
+    # Serial -> (chunk, slot) lookup, a ring indexed by serial % capacity
+
+    def _reserve(self, length):
+        """Grow the lookup and colour storage to hold ``length`` segments"""
+        if length <= self.capacity:
+            return
+        capacity = max(self.capacity, self.initial_capacity, COLOR_WIDTH)
+        while capacity < length:
+            capacity *= 2
+        chunk_of = np.zeros(capacity, dtype=np.int64)
+        slot_of = np.zeros(capacity, dtype=np.int64)
+        if self.capacity:
+            serials = np.arange(self.steps - self.length + 1, self.steps + 1)
+            chunk_of[serials % capacity] = self.chunk_of[serials % self.capacity]
+            slot_of[serials % capacity] = self.slot_of[serials % self.capacity]
+        self.chunk_of, self.slot_of = chunk_of, slot_of
+        self.capacity = capacity
+
+        self.color_rows = capacity // COLOR_WIDTH
+        self.colors = np.zeros((capacity, 3), dtype=np.float32)
+        self.color_key = None
+        self.colored_count = 0
+        glBindTexture(GL_TEXTURE_2D, self.color_texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB8, COLOR_WIDTH, self.color_rows, 0,
+                     GL_RGB, GL_FLOAT, self.colors)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    # Keeping the chunks in step with the snake
+
+    def _add(self, serial, cell, trail):
+        chunk_id = self._chunk_id(cell)
+        chunk = self._chunk(chunk_id)
+        slot = chunk.count
+        chunk.reserve(slot + 1)
+        chunk.instances[slot] = (*cell, serial % SERIAL_PERIOD, *trail, 0.0)
+        chunk.serials[slot] = serial
+        chunk.count += 1
+        chunk.dirty.add(slot)
+        self.chunk_counts[chunk_id] += 1
+        key = serial % self.capacity
+        self.chunk_of[key] = chunk_id
+        self.slot_of[key] = slot
+
+    def _remove(self, serial):
+        key = serial % self.capacity
+        chunk_id = int(self.chunk_of[key])
+        chunk = self.chunks[chunk_id]
+        slot = int(self.slot_of[key])
+        last = chunk.count - 1
+        if slot != last:
+            moved = int(chunk.serials[last])
+            chunk.instances[slot] = chunk.instances[last]
+            chunk.serials[slot] = moved
+            self.slot_of[moved % self.capacity] = slot
+            chunk.dirty.add(slot)
+        chunk.dirty.discard(last)
+        chunk.count = last
+        self.chunk_counts[chunk_id] -= 1
+
+    def _rebuild(self, snake):
+        """Rebucket the whole body"""
+        body = np.array(snake.body, dtype=np.int64)
+        length = len(body)
+        for chunk_id in np.flatnonzero(self.chunk_counts):
+            chunk = self.chunks[chunk_id]
+            chunk.count = 0
+            chunk.dirty.clear()
+        self.chunk_counts[:] = 0
+
+        serials = snake.steps - np.arange(length)
+        trails = np.empty_like(body)
+        trails[:-1] = body[1:]
+        trails[-1] = snake.last_tail if snake.last_tail is not None else body[-1]
+        chunk_ids = self._chunk_ids(body)
+
+        keys = serials % self.capacity
+        order = np.argsort(chunk_ids, kind='stable')
+        starts = np.flatnonzero(np.diff(chunk_ids[order], prepend=-1))
+        ends = np.append(starts[1:], length)
+        for start, end in zip(starts, ends):
+            members = order[start:end]
+            chunk_id = int(chunk_ids[members[0]])
+            chunk = self._chunk(chunk_id)
+            count = end - start
+            chunk.reserve(count)
+            instances = chunk.instances
+            instances[:count, :3] = body[members]
+            instances[:count, 3] = serials[members] % SERIAL_PERIOD
+            instances[:count, 4:7] = trails[members]
+            chunk.serials[:count] = serials[members]
+            chunk.count = count
+            chunk.stale = True
+            self.chunk_counts[chunk_id] = count
+            self.chunk_of[keys[members]] = chunk_id
+            self.slot_of[keys[members]] = np.arange(count)
+
+    def _sync_instances(self, snake):
+        body = snake.body
+        length = len(body)
+        delta = snake.steps - self.steps
+
+        if snake.wall != self.wall:
+            self._layout(snake.wall)
+            self.snake = None
+        if snake is not self.snake or delta < 0 or delta >= length:
+            self.steps, self.length = snake.steps, length
+            self._reserve(length)
+            self._rebuild(snake)
+        elif delta > 0:
+            # New body = the delta new heads + the front of the old body
+            tail_serial = self.steps - self.length + 1
+            for serial in range(tail_serial, tail_serial + self.length + delta - length):
+                self._remove(serial)
+            self._reserve(length)
+            for serial in range(self.steps + 1, snake.steps + 1):
+                index = snake.steps - serial
+                cell = body[index]
+                if index + 1 < length:
+                    trail = body[index + 1]
+                else:
+                    trail = snake.last_tail if snake.last_tail is not None else cell
+                self._add(serial, cell, trail)
+
+        self.snake = snake
+        self.steps = snake.steps
+        self.length = length
+
+    def _sync_colors(self, length):
+        """Refresh per-segment colours when the palette changes or the snake grows
+
+        Colours for a given palette key only depend on the segment index, so
+        with an unchanged key only segments past the ones already coloured
+        are written.
+        """
+        colors = self.palette.segment_colors(length)
+        color_key = self.palette.key
+        if color_key != self.color_key:
+            start = 0
+        else:
+            start = self.colored_count
+        if start >= length:
+            return
+
+        self.colors[start:length] = colors[start:length]
+        first_row, end_row = start // COLOR_WIDTH, -(-length // COLOR_WIDTH)
+        rows = self.colors[first_row * COLOR_WIDTH:end_row * COLOR_WIDTH]
+        glBindTexture(GL_TEXTURE_2D, self.color_texture)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, first_row, COLOR_WIDTH, end_row - first_row,
+                        GL_RGB, GL_FLOAT, rows)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        self.color_key = color_key
+        self.colored_count = length
+
+    def sync(self, snake):
+        """Bring the chunks and colours up to date with the snake"""
+        if self.program is None:
+            self._create_static()
+        self._sync_instances(snake)
+        self._sync_colors(len(snake.body))
+
+    # Drawing
+
+    def visible_chunks(self, frustum=None, point_pixels=0.0):
+        """Split the non-empty chunks into ones drawn as cubes and as points
+
+        Returns:
+            tuple: (cube chunk ids, point chunk ids, point sizes in pixels)
+        """
+        occupied = np.flatnonzero(self.chunk_counts)
+        if frustum is None:
+            return occupied, occupied[:0], np.zeros(0)
+        mins, maxs = self.box_min[occupied], self.box_max[occupied]
+        inside = frustum.boxes_visible(mins, maxs)
+        occupied, mins, maxs = occupied[inside], mins[inside], maxs[inside]
+        sizes = frustum.pixel_size(1.0, frustum.box_distances(mins, maxs))
+        far = sizes < point_pixels
+        return occupied[~far], occupied[far], sizes[far]
+
+    def draw(self, snake, visible_count, alpha=1.0, frustum=None, point_pixels=0.0):
+        """Draw the first ``visible_count`` segments of the snake
+
+        Args:
+            snake (Snake): Snake to draw
+            visible_count (int): Segments to draw, counted from the head
+            alpha (float): Interpolation from the previous tick (0) to the
+                current one (1)
+            frustum (Frustum, optional): Chunks outside it are skipped
+            point_pixels (float): Chunks where a segment would cover fewer
+                pixels than this are drawn as points
+        """
+        self.sync(snake)
+        if visible_count <= 0:
+            return
+
+        cube_chunks, point_chunks, point_sizes = self.visible_chunks(frustum, point_pixels)
+        self.last_chunks_drawn = len(cube_chunks) + len(point_chunks)
+        self.last_chunks_points = len(point_chunks)
+        self.last_chunks_culled = np.count_nonzero(self.chunk_counts) - self.last_chunks_drawn
+
+        uniforms = self.uniforms
+        glUseProgram(self.program)
+        glUniform1f(uniforms['alpha'], alpha)
+        glUniform1f(uniforms['steps'], snake.steps % SERIAL_PERIOD)
+        glUniform1f(uniforms['body_length'], len(snake.body))
+        glUniform1f(uniforms['visible_count'], visible_count)
+        glUniform1f(uniforms['tail_still'], 1.0 if snake.last_tail is None else 0.0)
+        glUniform1f(uniforms['head_scale'], self.HEAD_SCALE)
+        glUniform1f(uniforms['color_rows'], self.color_rows)
+        glUniform1i(uniforms['colors'], 0)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D, self.color_texture)
+        glEnableVertexAttribArray(INSTANCE_ATTRIBUTE)
+        glEnableVertexAttribArray(TRAIL_ATTRIBUTE)
+
+        stride = SnakeChunk.INSTANCE_BYTES
+        if len(cube_chunks):
+            glEnableVertexAttribArray(CORNER_ATTRIBUTE)
+            glBindBuffer(GL_ARRAY_BUFFER, self.cube_buffer)
+            glVertexAttribPointer(CORNER_ATTRIBUTE, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+            glVertexAttribDivisor(INSTANCE_ATTRIBUTE, 1)
+            glVertexAttribDivisor(TRAIL_ATTRIBUTE, 1)
+            for chunk_id in cube_chunks:
+                chunk = self.chunks[chunk_id]
+                chunk.upload()
+                glVertexAttribPointer(INSTANCE_ATTRIBUTE, 4, GL_FLOAT, GL_FALSE, stride,
+                                      ctypes.c_void_p(0))
+                glVertexAttribPointer(TRAIL_ATTRIBUTE, 3, GL_FLOAT, GL_FALSE, stride,
+                                      ctypes.c_void_p(16))
+                glDrawElementsInstanced(GL_TRIANGLES, len(CUBE_INDICES), GL_UNSIGNED_INT,
+                                        ctypes.c_void_p(0), chunk.count)
+            glVertexAttribDivisor(INSTANCE_ATTRIBUTE, 0)
+            glVertexAttribDivisor(TRAIL_ATTRIBUTE, 0)
+            glDisableVertexAttribArray(CORNER_ATTRIBUTE)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        if len(point_chunks):
+            glVertexAttrib3f(CORNER_ATTRIBUTE, 0.0, 0.0, 0.0)
+            for chunk_id, size in zip(point_chunks, point_sizes):
+                chunk = self.chunks[chunk_id]
+                chunk.upload()
+                glVertexAttribPointer(INSTANCE_ATTRIBUTE, 4, GL_FLOAT, GL_FALSE, stride,
+                                      ctypes.c_void_p(0))
+                glVertexAttribPointer(TRAIL_ATTRIBUTE, 3, GL_FLOAT, GL_FALSE, stride,
+                                      ctypes.c_void_p(16))
+                glPointSize(max(1.0, float(size)))
+                glDrawArrays(GL_POINTS, 0, chunk.count)
+
+        glDisableVertexAttribArray(INSTANCE_ATTRIBUTE)
+        glDisableVertexAttribArray(TRAIL_ATTRIBUTE)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+
+    def release(self):
+        """Free the GPU buffers, texture and shader"""
+        for chunk in self.chunks:
+            if chunk is not None:
+                chunk.release()
+        if self.program is not None:
+            glDeleteBuffers(2, [self.cube_buffer, self.index_buffer])
+            glDeleteTextures([self.color_texture])
+            glDeleteProgram(self.program)
+            self.program = None
+            self.cube_buffer = self.index_buffer = self.color_texture = None
+        self.capacity = 0
+        self.snake = None
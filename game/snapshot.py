@@ -0,0 +1,115 @@
+import struct
+import numpy as np
+
+# steps, length, direction, food, last tail, last food, flags, death cause,
+# death animation segment, then the timers as doubles
+_STATE = struct.Struct('<QI3h3h3h3hHBi7d')
+_RNG_STATE = struct.Struct('<B625I?d')  # version, Mersenne Twister state, gauss_next
+
+DEATH_CAUSES = (None, 'wall', 'self', 'victory', 'killed')
+
+_HAS_FOOD = 1
+_HAS_LAST_TAIL = 2
+_HAS_LAST_FOOD = 4
+_HAS_UPDATE_TIME = 8
+_GROW = 16
+_DYING = 32
+_VICTORY = 64
+_DEATH_COMPLETE = 128
+_SELF_COLLISION = 256
+_CORNER_RESERVED = 512
+
+class GameSnapshot:
+    """Immutable copy of everything that determines how a GameState plays on
+
+    Covers the body, direction, food, food RNG, timers, death sequence and
+    whether the cell off the Hamiltonian cycle is reserved; particles, the
+    AI's cached plan and the config are deliberately left out.
+    Taking one is O(length).
+    """
+
+    __slots__ = (
+        'body', 'direction', 'grow', 'steps', 'self_collision', 'last_tail',
+        'food', 'rng_state', 'food_bob_time', 'move_accumulator',
+        'physics_accumulator', 'last_update_time', 'dying', 'victory',
+        'death_cause', 'death_animation_segment', 'last_death_effect',
+        'death_complete', 'death_complete_time', 'death_speed', 'last_food_pos',
+        'corner_reserved'
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    def __eq__(self, other):
+        return isinstance(other, GameSnapshot) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def to_bytes(self):
+        """Serialize to a compact little-endian byte string"""
+        flags = (
+            (self.food is not None) * _HAS_FOOD
+            | (self.last_tail is not None) * _HAS_LAST_TAIL
+            | (self.last_food_pos is not None) * _HAS_LAST_FOOD
+            | (self.last_update_time is not None) * _HAS_UPDATE_TIME
+            | self.grow * _GROW
+            | self.dying * _DYING
+            | self.victory * _VICTORY
+            | self.death_complete * _DEATH_COMPLETE
+            | self.self_collision * _SELF_COLLISION
+            | self.corner_reserved * _CORNER_RESERVED
+        )
+        origin = (0, 0, 0)
+        data = bytearray(_STATE.pack(
+            self.steps, len(self.body), *self.direction,
+            *(self.food or origin), *(self.last_tail or origin), *(self.last_food_pos or origin),
+            flags, DEATH_CAUSES.index(self.death_cause), self.death_animation_segment,
+            self.food_bob_time, self.move_accumulator, self.physics_accumulator,
+            self.last_update_time or 0.0, self.last_death_effect,
+            self.death_complete_time, self.death_speed
+        ))
+        data += np.array(self.body, dtype=np.int16).tobytes()
+        version, internal, gauss_next = self.rng_state
+        data += _RNG_STATE.pack(version, *internal, gauss_next is not None, gauss_next or 0.0)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Inverse of to_bytes"""
+        fields = _STATE.unpack_from(data)
+        steps, length = fields[0], fields[1]
+        flags, cause, segment = fields[14], fields[15], fields[16]
+        (bob_time, move_accumulator, physics_accumulator, update_time,
+         last_death_effect, death_complete_time, death_speed) = fields[17:]
+
+        body = np.frombuffer(data, dtype=np.int16, count=length * 3, offset=_STATE.size)
+        rng = _RNG_STATE.unpack_from(data, _STATE.size + length * 6)
+
+        def cell(start, flag):
+            return tuple(fields[start:start + 3]) if flags & flag else None
+
+        return cls(
+            body=tuple(map(tuple, body.reshape(length, 3).tolist())),
+            direction=tuple(fields[2:5]),
+            grow=bool(flags & _GROW),
+            steps=steps,
+            self_collision=bool(flags & _SELF_COLLISION),
+            last_tail=cell(8, _HAS_LAST_TAIL),
+            food=cell(5, _HAS_FOOD),
+            rng_state=(rng[0], tuple(rng[1:626]), rng[627] if rng[626] else None),
+            food_bob_time=bob_time,
+            move_accumulator=move_accumulator,
+            physics_accumulator=physics_accumulator,
+            last_update_time=update_time if flags & _HAS_UPDATE_TIME else None,
+            dying=bool(flags & _DYING),
+            victory=bool(flags & _VICTORY),
+            death_cause=DEATH_CAUSES[cause],
+            death_animation_segment=segment,
+            last_death_effect=last_death_effect,
+            death_complete=bool(flags & _DEATH_COMPLETE),
+            death_complete_time=death_complete_time,
+            death_speed=death_speed,
+            last_food_pos=cell(11, _HAS_LAST_FOOD),
+            corner_reserved=bool(flags & _CORNER_RESERVED)
+        )
@@ -0,0 +1,48 @@
+class FixedTimestep:
+    """Accumulator turning elapsed wall time into a whole number of fixed ticks
+
+    Each frame adds the elapsed time to the accumulator and runs every tick
+    that is owed. At most ``max_steps`` ticks run per frame; any backlog
+    beyond that is dropped so a stalled frame cannot snowball into longer and
+    longer catch-up frames. What remains in the accumulator is the fraction
+    of the next tick that has already elapsed, used to interpolate rendering.
+    """
+
+    def __init__(self, step, max_steps):
+        """
+        Args:
+            step (float): Tick length, in the same unit as the elapsed times
+            max_steps (int): Upper bound on ticks run per frame
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def copy(self):
+        other = FixedTimestep(self.step, self.max_steps)
+        other.accumulator = self.accumulator
+        return other
+
+    def advance(self, elapsed):
+        """Add elapsed time and return the number of ticks to run now"""
+        self.accumulator += elapsed
+        if self.accumulator < self.step:
+            return 0
+
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator %= self.step
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of the next tick already elapsed, in [0, 1)"""
+        if self.step <= 0:
+            return 0.0
+        return min(self.accumulator / self.step, 1.0)
@@ -1,13 +1,26 @@
+import os
+import time
 import imgui
 from imgui.integrations.pygame import PygameRenderer
+from game.hamiltonian import HamiltonianPlanner
+from game.quality import (
+    QUALITY_LEVELS, particle_burst_count, particle_limit, point_pixels, sphere_detail
+)
 
 
 class UISystem:
-    def __init__(self, config, display):
+    def __init__(self, config, display, profiler=None, governor=None):
         self.config = config
         self.display = display
+        self.profiler = profiler
+        self.governor = governor
         self.window_visible = False
         
+        # Frames since the UI was last rebuilt; input always forces a rebuild
+        self.frames_since_rebuild = 0
+        self.pending_input = True
+        self.rebuilt = False
+        
         # ImGui setup
         imgui.create_context()
         self.io = imgui.get_io()
@@ -30,8 +43,18 @@ class UISystem:
         
     def handle_event(self, event):
         self.renderer.process_event(event)
+        self.pending_input = True
         
     def update(self, game_state):
+        # The quality governor may have the last frame's draw lists reused
+        self.frames_since_rebuild += 1
+        interval = self.governor.ui_interval if self.governor is not None else 1
+        self.rebuilt = self.pending_input or self.frames_since_rebuild >= interval
+        if not self.rebuilt:
+            return
+        self.frames_since_rebuild = 0
+        self.pending_input = False
+        
         imgui.new_frame()
         
         # Settings window configuration
@@ -79,6 +102,17 @@ class UISystem:
                 )
                 if changed:
                     self.config['particles']['count'] = value
+
+                changed, value = imgui.slider_int(
+                    "Max Live",
+                    self.config['particles']['max_live'],
+                    1024,
+                    self.config['particles']['capacity']
+                )
+                if changed:
+                    self.config['particles']['max_live'] = value
+                particle_system = game_state.particle_system
+                imgui.text(f"Live: {len(particle_system):,}  Evicted: {particle_system.evicted:,}")
                     
         # Snake settings section
         expanded, visible = imgui.collapsing_header("Snake")
@@ -135,6 +169,55 @@ class UISystem:
             )
             if changed:
                 self.config['snake']['speed'] = 101 - display_value
+            
+            strategies = self.config['ai']['strategies']
+            changed, index = imgui.combo(
+                "AI Strategy",
+                strategies.index(self.config['ai']['strategy']),
+                strategies
+            )
+            if changed:
+                self.config['ai']['strategy'] = strategies[index]
+            
+            if self.config['ai']['strategy'] == 'astar':
+                changed, value = imgui.slider_float(
+                    "Plan Budget",
+                    self.config['ai']['plan_budget_ms'],
+                    0.5, 50.0,
+                    format="%.1f ms"
+                )
+                if changed:
+                    self.config['ai']['plan_budget_ms'] = value
+            elif self.config['ai']['strategy'] == 'lookahead':
+                changed, value = imgui.slider_float(
+                    "Search Budget",
+                    self.config['ai']['lookahead_budget_ms'],
+                    0.5, 50.0,
+                    format="%.1f ms/frame"
+                )
+                if changed:
+                    self.config['ai']['lookahead_budget_ms'] = value
+                    
+                changed, value = imgui.slider_int(
+                    "Rollout Depth",
+                    self.config['ai']['lookahead_depth'],
+                    4, 128
+                )
+                if changed:
+                    self.config['ai']['lookahead_depth'] = value
+                    
+                lookahead = game_state.lookahead
+                imgui.text(f"Nodes/s: {lookahead.nodes_per_sec:,.0f}  "
+                           f"({lookahead.last_rollouts} rollouts)")
+            elif self.config['ai']['strategy'] == 'hamiltonian':
+                changed, value = imgui.slider_float(
+                    "Shortcut Limit",
+                    self.config['ai']['hamiltonian_max_fill'],
+                    0.0, HamiltonianPlanner.MAX_FILL,
+                    format="%.2f"
+                )
+                if changed:
+                    self.config['ai']['hamiltonian_max_fill'] = value
 
         # Camera settings section
         expanded, visible = imgui.collapsing_header("Camera")
@@ -155,11 +238,91 @@ class UISystem:
                 base_x, base_y = 0.002, 0.001
                 self.config['camera']['rotation_speed']['x'] = base_x * value
                 self.config['camera']['rotation_speed']['y'] = base_y * value
+        
+        if self.governor is not None:
+            self.draw_quality_panel()
+        if self.profiler is not None:
+            self.draw_performance_panel()
             
         imgui.end()
         
+    def draw_quality_panel(self):
+        """Adaptive quality level, the knobs it drives and its recent changes"""
+        expanded, visible = imgui.collapsing_header("Quality")
+        if not expanded:
+            return
+            
+        quality = self.config['quality']
+        changed, quality['adaptive'] = imgui.checkbox("Adaptive", quality['adaptive'])
+        if not quality['adaptive']:
+            level = quality['fixed_level']
+            changed, value = imgui.slider_int(
+                "Fixed Level",
+                level,
+                0, len(QUALITY_LEVELS) - 1,
+                format=f"%d ({QUALITY_LEVELS[level]['name']})"
+            )
+            if changed:
+                quality['fixed_level'] = value
+                
+        governor = self.governor
+        imgui.text(f"Level: {governor.level_name}  "
+                   f"Frame: {governor.frame_ms or 0.0:.1f} / {governor.budget_ms:.1f} ms")
+        imgui.text(f"Particles: {particle_burst_count(self.config)} per burst, "
+                   f"{particle_limit(self.config):,} live")
+        detail = ", ".join(str(value) for value in sphere_detail(self.config))
+        imgui.text(f"Sphere Detail: {detail}")
+        imgui.text(f"Point LOD: {point_pixels(self.config):.1f} px  "
+                   f"UI Every: {governor.ui_interval} frames")
+        for stamp, name, reason in reversed(governor.changes):
+            imgui.text_disabled(f"{stamp}  {name}: {reason}")
+        
+    def draw_performance_panel(self):
+        """Per-stage frame timings, frame-time graph and export buttons"""
+        expanded, visible = imgui.collapsing_header("Performance")
+        if not expanded:
+            return
+            
+        changed, self.config['profiler']['enabled'] = imgui.checkbox(
+            "Profiling",
+            self.config['profiler']['enabled']
+        )
+        if not self.config['profiler']['enabled']:
+            return
+            
+        frame_times = self.profiler.frame_times_ms()
+        if len(frame_times) > 0:
+            imgui.plot_lines(
+                "Frame (ms)", frame_times,
+                scale_min=0.0, graph_size=(0, 60)
+            )
+            
+        imgui.columns(4, "timings", border=False)
+        for label in ("Stage", "p50", "p95", "p99"):
+            imgui.text(label)
+            imgui.next_column()
+        for name, values in self.profiler.percentiles().items():
+            imgui.text(name)
+            imgui.next_column()
+            for value in values:
+                imgui.text(f"{value:.2f}")
+                imgui.next_column()
+        imgui.columns(1)
+        
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        export_dir = self.config['profiler']['export_dir']
+        if imgui.button("Export CSV"):
+            self.profiler.export_csv(os.path.join(export_dir, f"profile-{stamp}.csv"))
+        imgui.same_line()
+        if imgui.button("Export JSON"):
+            self.profiler.export_json(os.path.join(export_dir, f"profile-{stamp}.json"))
+        imgui.same_line()
+        if imgui.button("Reset"):
+            self.profiler.clear()
+        
     def render(self):
-        imgui.render()
+        if self.rebuilt:
+            imgui.render()
         self.renderer.render(imgui.get_draw_data())
         
     def shutdown(self):
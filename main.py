@@ -4,14 +4,24 @@ from OpenGL.GL import (
     glEnable, glDepthFunc, glTranslatef, GL_DEPTH_TEST, 
     GL_LESS, glDisable, glViewport
 )
-from OpenGL.GLU import gluPerspective
 from config import config
 from game.renderer import Renderer
 from game.game_state import GameState
-from game.camera import Camera, calculate_viewport
+from game.camera import Camera, calculate_viewport, set_perspective
 from game.ui_system import UISystem
+from game.profiler import FrameProfiler
+from game.quality import QualityGovernor
+from game.replay import ReplayRecorder, ReplayReader, ReplayPlayer
+import argparse
 import os
+import random
 import sys
+import time
+
+PROFILED_STAGES = [
+    'events', 'game_update', 'camera', 'ui_update',
+    'render_scene', 'particles', 'ui_render', 'flip', 'wait'
+]
 
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -48,7 +58,7 @@ def initialize_gl(config):
     
     # Use fixed aspect ratio for perspective
     aspect_ratio = 16/9
-    gluPerspective(45, aspect_ratio, 0.1, 500.0)
+    set_perspective(config, aspect_ratio)
     glTranslatef(0.0, 0.0, -100)
     
     if config['display'].get('vsync', True):
@@ -59,8 +69,8 @@ def initialize_gl(config):
 def handle_keyboard_input(event, config, game_state):
     """Process keyboard controls"""
     key_actions = {
-        pygame.K_k: lambda: setattr(game_state, 'dying', True),
-        pygame.K_t: lambda: setattr(game_state.snake, 'grow', True),
+        pygame.K_k: game_state.kill,
+        pygame.K_t: game_state.grow_snake,
         pygame.K_c: lambda: toggle_camera_rotation(config),
         pygame.K_p: lambda: toggle_particles(config, game_state)
     }
@@ -133,7 +143,7 @@ def process_events(ui_system, config, game_state, mouse_state, camera):
             
             # Use the target aspect ratio for perspective calculation
             aspect_ratio = 16/9  # Maintain 16:9 ratio
-            gluPerspective(45, aspect_ratio, 0.1, 500.0)
+            set_perspective(config, aspect_ratio)
             
             # Update UI system display size
             ui_system.display = new_display
@@ -146,32 +156,55 @@ def process_events(ui_system, config, game_state, mouse_state, camera):
     
     return True
 
-def game_loop(display, game_state, renderer, ui_system, camera, mouse_state, clock):
-    """Main game loop"""
+def game_loop(display, game_state, renderer, ui_system, camera, mouse_state, clock, profiler,
+              governor, player=None):
+    """Main game loop, driven by a ReplayPlayer instead of the AI if one is given"""
     while True:
+        profiler.enabled = config['profiler']['enabled']
+        profiler.begin_frame()
+        frame_start = time.perf_counter()
         current_time = pygame.time.get_ticks()
         
-        if not process_events(ui_system, config, game_state, mouse_state, camera):
+        with profiler.stage('events'):
+            running = process_events(ui_system, config, game_state, mouse_state, camera)
+        if not running:
             break
             
         # Update game state
-        game_state.update(current_time)
-        camera.update()
-        ui_system.update(game_state)
+        with profiler.stage('game_update'):
+            if player is not None:
+                player.update(current_time)
+            else:
+                game_state.update(current_time)
+        with profiler.stage('camera'):
+            camera.update()
+        with profiler.stage('ui_update'):
+            ui_system.update(game_state)
         
         # Update camera auto-spin
         if not mouse_state['dragging'] and mouse_state['manual_speed'] < 0.5:
             camera.auto_spin()
         
         # Render frame
-        render_scene(renderer, display, camera, game_state)
-        handle_particles(game_state)
+        with profiler.stage('render_scene'):
+            render_scene(renderer, display, camera, game_state)
+        with profiler.stage('particles'):
+            handle_particles(renderer, game_state)
         
         glDisable(GL_DEPTH_TEST)
-        ui_system.render()
-        pygame.display.flip()
+        with profiler.stage('ui_render'):
+            ui_system.render()
+        work_end = time.perf_counter()
+        with profiler.stage('flip'):
+            pygame.display.flip()
+        # Without vsync the flip only waits for the GPU, which is still work
+        if not config['display'].get('vsync', True):
+            work_end = time.perf_counter()
+        governor.update(work_end - frame_start)
         
-        clock.tick(config['display']['fps'])
+        with profiler.stage('wait'):
+            clock.tick(config['display']['fps'])
+        profiler.end_frame()
 
 def update_game(game_state, camera, ui_system, current_time):
     """Update game state components."""
@@ -185,36 +218,70 @@ def render_scene(renderer, display, camera, game_state):
     glEnable(GL_DEPTH_TEST)
     
     renderer.draw_grid()
-    renderer.draw_snake(game_state.get_visible_segments())
-    renderer.draw_sphere(game_state.get_food_position(), 0.8, (1, 0, 0))
+    renderer.draw_snake(
+        game_state.snake,
+        game_state.get_visible_count(),
+        game_state.get_interpolation_alpha()
+    )
+    food_position = game_state.get_food_position()
+    if food_position is not None:
+        renderer.draw_sphere(food_position, 0.8, (1, 0, 0))
 
-def handle_particles(game_state):
-    """Handle particle system updates."""
+def handle_particles(renderer, game_state):
+    """Draw the particles emitted by the simulation."""
     # Early return if particles disabled
     if not config['particles']['enabled']:
         return
         
-    particle_system = game_state.particle_system
-    particle_system.draw()
-    
-    # Only process food collection once
-    if game_state.food_collected:
-        particle_system.emit_particles(
-            position=game_state.last_food_pos,
-            color=[1.0, 0.0, 0.0],
-            count=config['particles']['count']
-        )
-        game_state.food_collected = False
+    renderer.draw_particles(game_state.particle_system)
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AutoSnake3D")
+    parser.add_argument('--record', action='store_true',
+                        help="record the session to a replay file")
+    parser.add_argument('--replay', help="play back a replay file instead of running the AI")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay playback speed")
+    parser.add_argument('--start', type=int, default=0, help="replay tick to start from")
+    parser.add_argument('--quality', type=int,
+                        help="hold a fixed quality level (0-3) instead of adapting it")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Initialize and run the game"""
+    args = parse_args(argv)
+    if args.quality is not None:
+        config['quality']['adaptive'] = False
+        config['quality']['fixed_level'] = args.quality
     display = initialize_gl(config)
     clock = pygame.time.Clock()
     
     # Initialize components
-    game_state = GameState(config)
-    renderer = Renderer(config)
-    ui_system = UISystem(config, display)
+    recorder = reader = player = None
+    if args.replay:
+        reader = ReplayReader(args.replay)
+        config['gameplay']['boundary'] = reader.boundary
+        game_state = GameState(config)
+        player = ReplayPlayer(reader, game_state, args.speed, args.start)
+    elif args.record or config['replay']['record']:
+        seed = random.randrange(2**63)
+        game_state = GameState(config, seed=seed)
+        path = os.path.join(
+            config['replay']['directory'], time.strftime("replay-%Y%m%d-%H%M%S.replay")
+        )
+        recorder = ReplayRecorder(
+            path, seed, config['replay']['keyframe_interval'], config['gameplay']['boundary']
+        )
+        recorder.attach(game_state)
+    else:
+        game_state = GameState(config)
+    renderer = Renderer(config, game_state.palette)
+    profiler = FrameProfiler(
+        PROFILED_STAGES,
+        history=config['profiler']['history'],
+        enabled=config['profiler']['enabled']
+    )
+    governor = QualityGovernor(config)
+    ui_system = UISystem(config, display, profiler, governor)
     camera = Camera(config)
     
     mouse_state = {
@@ -224,8 +291,14 @@ def main():
     }
 
     try:
-        game_loop(display, game_state, renderer, ui_system, camera, mouse_state, clock)
+        game_loop(display, game_state, renderer, ui_system, camera, mouse_state, clock, profiler,
+                  governor, player)
     finally:
+        if recorder is not None:
+            recorder.close()
+        if reader is not None:
+            reader.close()
+        renderer.release()
         ui_system.shutdown()
         pygame.quit()
 
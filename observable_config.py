@@ -0,0 +1,112 @@
+import copy
+
+_MISSING = object()
+
+class ObservableConfig(dict):
+    """Nested config dict that counts and announces its changes
+
+    Every nested dict is wrapped in an ObservableConfig section with its own
+    ``version``. Storing a value that differs from the current one bumps the
+    version of its section and of every section above it, then calls their
+    subscribers, innermost first. Writing back an equal value, as the UI
+    does every frame, changes nothing, so derived state can be cached
+    against a version and rebuilt only when its inputs really change:
+
+        if config['snake']['colors'].version != self.colors_version:
+            ...
+
+    Only writes through the dict interface are seen: replace lists and
+    tuples instead of mutating them in place. Copies and pickles carry the
+    values but not the versions or subscribers.
+    """
+
+    def __init__(self, values=(), parent=None):
+        super().__init__()
+        self.parent = parent
+        self.version = 0
+        self.subscribers = []
+        for key, value in dict(values).items():
+            dict.__setitem__(self, key, self._wrap(value))
+
+    def _wrap(self, value):
+        if isinstance(value, dict):
+            return ObservableConfig(value, self)
+        return value
+
+    def _changed(self):
+        section = self
+        while section is not None:
+            section.version += 1
+            for callback in list(section.subscribers):
+                callback(section)
+            section = section.parent
+
+    def subscribe(self, callback):
+        """Call callback(section) after every change in or below this section"""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def __setitem__(self, key, value):
+        old = self.get(key, _MISSING)
+        same_kind = type(old) is type(value) or (isinstance(old, dict) and isinstance(value, dict))
+        if same_kind and old == value:
+            return
+        value = self._wrap(value)
+        if isinstance(old, ObservableConfig) and isinstance(value, ObservableConfig):
+            # Whoever watched the replaced section keeps watching its successor
+            value.version = old.version
+            value.subscribers = old.subscribers
+            old.parent = None
+        dict.__setitem__(self, key, value)
+        if isinstance(value, ObservableConfig):
+            value._changed()
+        else:
+            self._changed()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        value = dict.pop(self, key)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._changed()
+        return item
+
+    def clear(self):
+        if self:
+            dict.clear(self)
+            self._changed()
+
+    def to_dict(self):
+        """Plain nested dict copy of the values"""
+        return {
+            key: value.to_dict() if isinstance(value, ObservableConfig) else value
+            for key, value in self.items()
+        }
+
+    def __copy__(self):
+        return ObservableConfig(self.to_dict())
+
+    def __deepcopy__(self, memo):
+        return ObservableConfig(copy.deepcopy(self.to_dict(), memo))
+
+    def __reduce__(self):
+        return (ObservableConfig, (self.to_dict(),))
@@ -1,78 +1,204 @@
-import random
 import math
-from OpenGL.GL import *
+import numpy as np
 
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
-        glPointSize(5.0)
+    """Fixed-capacity particle pool; drawing lives in the Renderer
+
+    Particles are stored as parallel NumPy arrays (structure of arrays). The
+    first ``count`` entries are live, so integration runs as a handful of
+    vectorized operations and dead particles are removed by compacting the
+    live ones to the front.
+
+    At most ``limit`` particles are live at once. Emitting past it evicts
+    the faintest particles first (the lowest remaining lifetime fraction,
+    which is also how transparent they are drawn), so a burst always shows
+    up and the per-frame cost stays bounded however much is emitted.
+    """
+
+    GRAVITY = 25.0
+
+    def __init__(self, capacity=131072, limit=None, seed=None):
+        """
+        Args:
+            capacity (int): Particles the pool can hold
+            limit (int, optional): Live particles allowed, defaults to capacity
+            seed (int, optional): Seed of the emission Generator
+        """
+        self.capacity = capacity
+        self.limit = capacity if limit is None else min(limit, capacity)
+        self.rng = np.random.default_rng(seed)
+        self.positions = np.zeros((capacity, 3), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 3), dtype=np.float32)
+        self.colors = np.zeros((capacity, 3), dtype=np.float32)
+        self.lifetimes = np.zeros(capacity, dtype=np.float32)
+        self.max_lifetimes = np.ones(capacity, dtype=np.float32)
+        self.count = 0
+        self.evicted = 0
+        self._vertex_data = None
+
+    def __len__(self):
+        return self.count
+
+    def _compact(self, keep):
+        """Move the live particles selected by a boolean mask to the front"""
+        n = self.count
+        live_count = int(np.count_nonzero(keep))
+        for array in (self.positions, self.velocities, self.colors,
+                      self.lifetimes, self.max_lifetimes):
+            array[:live_count] = array[:n][keep]
+        self.count = live_count
+
+    def _allocate(self, wanted):
+        """Slots for up to ``wanted`` new particles under the limit
+
+        Past the limit the faintest live particles are evicted and their
+        slots reused, so making room never moves the other particles.
+
+        Returns:
+            np.ndarray: Indices to write the new particles to
+        """
+        limit = min(self.limit, self.capacity)
+        if self.count > limit:
+            # The limit was lowered; drop the faintest down to it
+            n = self.count
+            keep = np.ones(n, dtype=bool)
+            keep[self._faintest(n - limit)] = False
+            self._compact(keep)
+            self.evicted += n - limit
+
+        wanted = min(wanted, limit)
+        n = self.count
+        free = limit - n
+        if wanted <= free:
+            self.count = n + wanted
+            return np.arange(n, n + wanted)
+        excess = wanted - free
+        self.evicted += min(excess, n)
+        if excess >= n:
+            self.count = wanted
+            return np.arange(wanted)
+        # Rank only the n live particles; slots past them hold stale data
+        evict = self._faintest(excess)
+        self.count = limit
+        return np.concatenate((evict, np.arange(n, limit)))
+
+    def _faintest(self, k):
+        """Indices of the k live particles with the least lifetime left"""
+        n = self.count
+        fractions = self.lifetimes[:n] / self.max_lifetimes[:n]
+        return np.argpartition(fractions, k - 1)[:k]
+
+    def emit_burst(self, origins, count, colors, speed=(5.0, 15.0), lifetime=(0.5, 2.0),
+                   color_variation=0.0, velocity_box=None):
+        """Emit ``count`` particles from each origin in one vectorized batch
+
+        Args:
+            origins: Emission points, shape (n, 3)
+            count (int): Particles per origin
+            colors: One rgb colour for all origins or one per origin
+            speed (tuple): Speed range of velocities in random directions
+            lifetime (tuple): Lifetime range in seconds
+            color_variation (float): Per-channel random offset range
+            velocity_box (tuple, optional): (low, high) xyz corners; velocities
+                are drawn uniformly from this box instead
+
+        Returns:
+            int: Particles emitted, fewer than asked only past the limit
+        """
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 3)
+        colors = np.broadcast_to(np.asarray(colors, dtype=np.float32).reshape(-1, 3), origins.shape)
+        slots = self._allocate(len(origins) * count)
+        emitted = len(slots)
+        if emitted == 0:
+            return 0
+
+        rng = self.rng
+        source = np.arange(emitted) // count
+        self.positions[slots] = origins[source]
+
+        if velocity_box is None:
+            # Same angle parameterisation the single-particle emitter used
+            polar = rng.uniform(0.0, 2 * math.pi, emitted)
+            azimuth = rng.uniform(0.0, 2 * math.pi, emitted)
+            speeds = rng.uniform(speed[0], speed[1], emitted)
+            sin_polar = np.sin(polar)
+            self.velocities[slots] = np.stack((
+                speeds * sin_polar * np.cos(azimuth),
+                speeds * sin_polar * np.sin(azimuth),
+                speeds * np.cos(polar)
+            ), axis=1)
+        else:
+            self.velocities[slots] = rng.uniform(velocity_box[0], velocity_box[1], (emitted, 3))
+
+        burst_colors = colors[source]
+        if color_variation:
+            burst_colors = np.minimum(
+                1.0, burst_colors + rng.uniform(-color_variation, color_variation, (emitted, 3))
+            )
+        self.colors[slots] = burst_colors
+
+        lifetimes = rng.uniform(lifetime[0], lifetime[1], emitted)
+        self.lifetimes[slots] = lifetimes
+        self.max_lifetimes[slots] = lifetimes
+        return emitted
 
     def emit_particles(self, position, count=None, color=(1.0, 0.5, 0.0)):
         """Emit multiple particles from a position with random velocities"""
         particle_count = count if count is not None else 30
-        
-        for _ in range(particle_count):
-            # Calculate random velocity in sphere
-            angle1 = random.uniform(0, 2 * math.pi)
-            angle2 = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(5, 15)
-            
-            velocity = [
-                speed * math.sin(angle1) * math.cos(angle2),
-                speed * math.sin(angle1) * math.sin(angle2),
-                speed * math.cos(angle1)
-            ]
-            
-            # Apply color variation
-            varied_color = [
-                min(1.0, c + random.uniform(-0.2, 0.2))
-                for c in color
-            ]
-            
-            self.emit_particle(
-                position=position, 
-                velocity=velocity, 
-                color=varied_color, 
-                lifetime=random.uniform(0.5, 2.0)
-            )
+        self.emit_burst([position], particle_count, color, color_variation=0.2)
 
     def emit_particle(self, position, velocity, color, lifetime):
-        """Create a single particle with specified properties"""
-        self.particles.append({
-            'position': list(position),
-            'velocity': velocity,
-            'color': color,
-            'lifetime': lifetime,
-            'max_lifetime': lifetime
-        })
+        """Create a single particle with specified properties
+
+        Evicts the faintest particle if the pool is at its limit.
+        """
+        slots = self._allocate(1)
+        if len(slots) == 0:
+            return
+        index = slots[0]
+        self.positions[index] = position
+        self.velocities[index] = velocity
+        self.colors[index] = color
+        self.lifetimes[index] = lifetime
+        self.max_lifetimes[index] = lifetime
+
+    def pack_vertices(self):
+        """Interleave live particles into one float32 vertex array
+
+        Each row is ``x, y, z, r, g, b, a`` so the whole pool can be uploaded
+        to a vertex buffer in one call. The returned array is a view into a
+        staging buffer that is reused on every call.
+
+        Returns:
+            np.ndarray: Array of shape (count, 7)
+        """
+        if self._vertex_data is None:
+            self._vertex_data = np.empty((self.capacity, 7), dtype=np.float32)
+        n = self.count
+        packed = self._vertex_data[:n]
+        packed[:, 0:3] = self.positions[:n]
+        packed[:, 3:6] = self.colors[:n]
+        np.divide(self.lifetimes[:n], self.max_lifetimes[:n], out=packed[:, 6])
+        return packed
 
     def update(self, dt):
         """Update particle physics and remove dead particles"""
-        for particle in self.particles:
-            # Update position based on velocity
-            for i in range(3):
-                particle['position'][i] += particle['velocity'][i] * dt
-            
-            # Apply gravity
-            particle['velocity'][1] -= 25.0 * dt
-            particle['lifetime'] -= dt
-        
-        self.particles = [p for p in self.particles if p['lifetime'] > 0]
-
-    def draw(self):
-        """Render all active particles"""
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        
-        glBegin(GL_POINTS)
-        for particle in self.particles:
-            alpha = particle['lifetime'] / particle['max_lifetime']
-            glColor4f(*particle['color'], alpha)
-            glVertex3f(*particle['position'])
-        glEnd()
-        
-        glDisable(GL_BLEND)
+        n = self.count
+        if n == 0:
+            return
+
+        positions = self.positions[:n]
+        velocities = self.velocities[:n]
+        lifetimes = self.lifetimes[:n]
+
+        positions += velocities * dt
+        velocities[:, 1] -= self.GRAVITY * dt
+        lifetimes -= dt
+
+        alive = lifetimes > 0
+        if not alive.all():
+            self._compact(alive)
 
     def clear_particles(self):
         """Remove all active particles"""
-        self.particles.clear()
\ No newline at end of file
+        self.count = 0
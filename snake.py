@@ -1,43 +1,154 @@
+from collections import deque
+
 class Snake:
-    """Represents the snake entity and handles its movement and collision detection"""
-    
-    def __init__(self):
-        self.body = [(0, 0, 0)]  # Start at origin
+    """Represents the snake entity and handles its movement and collision detection
+
+    The body is a deque (head at index 0) so pushing a head and popping a tail
+    are O(1). Every cell the body covers is mirrored in the ``occupied`` set,
+    which all collision and move-validity checks go through. An optional
+    FreeCells index is updated on every head push and tail pop, ``steps``
+    counts head pushes so consumers can tell how far the body has advanced
+    and ``last_tail`` is the cell vacated by the latest move (None if the
+    snake grew instead). The head dies once a coordinate exceeds ``wall``.
+
+    copy() shares the body and occupancy set between both snakes until either
+    of them moves, so forking a snake is O(1).
+    """
+
+    def __init__(self, free_cells=None, body=None, wall=25):
+        """
+        Args:
+            free_cells (FreeCells, optional): Index to keep in sync with the body
+            body (iterable, optional): Cells head first, defaults to the origin
+            wall (int): Largest absolute coordinate the head survives at
+        """
+        self.body = deque(body if body is not None else [(0, 0, 0)])  # Start at origin
+        self.occupied = set(self.body)
+        self.free_cells = free_cells
+        self.wall = wall
+        if free_cells is not None:
+            for cell in self.body:
+                free_cells.occupy(cell)
         self.direction = (1, 0, 0)  # Initial direction: +x axis
         self.grow = False
-        
+        self.self_collision = False
+        self.steps = 0
+        self.last_tail = None
+        self._shared = False
+
+    def copy(self, free_cells=None):
+        """Copy-on-write copy of the snake
+
+        Args:
+            free_cells (FreeCells, optional): The copy's own free-cell index,
+                normally a copy() of this snake's
+        """
+        other = Snake.__new__(Snake)
+        other.__dict__.update(self.__dict__)
+        other.free_cells = free_cells
+        self._shared = other._shared = True
+        return other
+
+    def private_copy(self):
+        """O(length) copy without a free-cell index that shares nothing
+
+        Unlike copy() it leaves this snake's copy-on-write state alone, so
+        the original does not pay for a copy on its next move.
+        """
+        other = Snake.__new__(Snake)
+        other.__dict__.update(self.__dict__)
+        other.body = deque(self.body)
+        other.occupied = set(self.occupied)
+        other.free_cells = None
+        other._shared = False
+        return other
+
+    def _unshare(self):
+        self.body = deque(self.body)
+        self.occupied = set(self.occupied)
+        self._shared = False
+
     def move(self, new_direction=None):
         """Move the snake in the current or new direction
-        
+
         Args:
             new_direction (tuple, optional): New direction as (x, y, z)
         """
         if new_direction:
             self.direction = new_direction
-        
+        if self._shared:
+            self._unshare()
+
         # Calculate new head position
-        new_head = tuple(
-            current + direction 
-            for current, direction in zip(self.body[0], self.direction)
-        )
-        
-        # Update body
-        self.body.insert(0, new_head)
+        head_x, head_y, head_z = self.body[0]
+        dir_x, dir_y, dir_z = self.direction
+        new_head = (head_x + dir_x, head_y + dir_y, head_z + dir_z)
+
+        # Free the tail first so the head may follow it into its old cell
+        self.last_tail = None
         if not self.grow:
-            self.body.pop()
+            tail = self.body.pop()
+            self.occupied.discard(tail)
+            if self.free_cells is not None:
+                self.free_cells.release(tail)
+            self.last_tail = tail
         self.grow = False
 
+        self.self_collision = new_head in self.occupied
+        self.body.appendleft(new_head)
+        self.occupied.add(new_head)
+        if self.free_cells is not None:
+            self.free_cells.occupy(new_head)
+        self.steps += 1
+
+    def undo(self, direction, grow, last_tail, self_collision):
+        """Reverse the latest move()
+
+        Lets search code probe moves on one snake instead of copying it.
+
+        Args:
+            direction, grow, last_tail, self_collision: The snake's attributes
+                of the same names from before that move
+        """
+        head = self.body.popleft()
+        # A colliding head was already part of the body
+        if not self.self_collision:
+            self.occupied.discard(head)
+            if self.free_cells is not None:
+                self.free_cells.release(head)
+        if self.last_tail is not None:
+            self.body.append(self.last_tail)
+            self.occupied.add(self.last_tail)
+            if self.free_cells is not None:
+                self.free_cells.occupy(self.last_tail)
+        self.direction = direction
+        self.grow = grow
+        self.last_tail = last_tail
+        self.self_collision = self_collision
+        self.steps -= 1
+
+    def is_occupied(self, position):
+        """Check whether a cell is covered by the snake's body
+
+        Args:
+            position (tuple): Cell as (x, y, z)
+
+        Returns:
+            bool: True if any segment occupies the cell
+        """
+        return position in self.occupied
+
     def check_collision(self):
         """Check for collisions with walls and self
-        
+
         Returns:
             bool: True if collision detected, False otherwise
         """
         head_x, head_y, head_z = self.body[0]
-        
+
         # Check wall boundaries
-        if any(abs(coord) > 25 for coord in (head_x, head_y, head_z)):
+        if any(abs(coord) > self.wall for coord in (head_x, head_y, head_z)):
             return True
-            
-        # Check self-collision
-        return self.body[0] in self.body[1:]
\ No newline at end of file
+
+        # Self-collision is detected while moving, against the occupancy set
+        return self.self_collision
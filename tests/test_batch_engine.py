@@ -0,0 +1,44 @@
+import numpy as np
+from bench import make_config
+from game.batch_engine import BatchSnakeEngine, CAUSES
+from game.game_state import GameState
+from game.pathfinding import DIRECTIONS
+
+BOUNDARY = 4
+SEEDS = list(range(100, 108))
+
+def scalar_games():
+    config = make_config('greedy')
+    config['gameplay']['boundary'] = BOUNDARY
+    return [GameState(config, seed=seed) for seed in SEEDS]
+
+def play_in_step(engine, games, actions=None, steps=1500):
+    deaths = 0
+    for step in range(steps):
+        _, done, causes, final_lengths = engine.step(actions[step] if actions is not None else None)
+        for index, game in enumerate(games):
+            move = DIRECTIONS[actions[step][index]] if actions is not None else None
+            if not game.tick(move):
+                deaths += 1
+                assert done[index]
+                assert CAUSES[causes[index]] == game.death_cause
+                assert final_lengths[index] == len(game.snake.body)
+                game.reset()
+                continue
+            assert not done[index]
+            assert tuple(engine.heads[index]) == game.snake.body[0]
+            assert tuple(engine.foods[index]) == game.food
+            assert engine.lengths[index] == len(game.snake.body)
+            assert engine.free_count[index] == len(game.free_cells)
+            assert [tuple(cell) for cell in engine.body_of(index)] == list(game.snake.body)
+    return deaths
+
+def test_greedy_games_match_game_state():
+    # A small ring buffer also exercises growing it
+    engine = BatchSnakeEngine(len(SEEDS), SEEDS, boundary=BOUNDARY, capacity=4)
+    assert play_in_step(engine, scalar_games()) > 0
+
+def test_given_actions_match_game_state():
+    actions = np.random.default_rng(1).integers(0, len(DIRECTIONS), (1500, len(SEEDS)))
+    engine = BatchSnakeEngine(len(SEEDS), SEEDS, boundary=BOUNDARY)
+    assert play_in_step(engine, scalar_games(), actions) > 0
@@ -0,0 +1,70 @@
+from bench import make_config
+from game.game_state import GameState
+from game.snapshot import GameSnapshot
+
+def test_plain_dict_config():
+    config = make_config('greedy').to_dict()
+    game = GameState(config, seed=3)
+    for now in range(0, 2000, 16):
+        game.update(now)
+    assert game.snake.steps > 0
+    assert len(game.palette.segment_colors(len(game.snake.body))) == len(game.snake.body)
+
+    game.config['snake']['speed'] = 10
+    game.update(2016)
+    assert game.game_speed == 10
+
+def played_game(seed=5, moves=300):
+    config = make_config('greedy')
+    config['gameplay']['boundary'] = 6
+    game = GameState(config, seed=seed)
+    for _ in range(moves):
+        if not game.tick():
+            game.reset()
+    return game
+
+def future(game, moves=200):
+    bodies = []
+    for _ in range(moves):
+        if not game.tick():
+            break
+        bodies.append((tuple(game.snake.body), game.food))
+    return bodies
+
+def test_snapshot_round_trips_through_bytes():
+    snapshot = played_game().snapshot()
+    assert GameSnapshot.from_bytes(snapshot.to_bytes()) == snapshot
+
+def test_restore_replays_the_same_future():
+    game = played_game()
+    snapshot = game.snapshot()
+    free_count = len(game.free_cells)
+    expected = future(game)
+
+    other = played_game(seed=9, moves=50)
+    other.restore(GameSnapshot.from_bytes(snapshot.to_bytes()))
+    assert other.snapshot() == snapshot
+    assert len(other.free_cells) == free_count
+    assert future(other) == expected
+
+def test_clones_do_not_affect_each_other():
+    game = played_game()
+    before = game.snapshot()
+    free_before = len(game.free_cells)
+
+    clone = game.clone()
+    assert clone.snapshot() == before
+    clone_future = future(clone)
+    assert game.snapshot() == before
+    assert len(game.free_cells) == free_before
+
+    # The original draws the same food the clone did from the shared RNG state
+    assert future(game) == clone_future
+    assert clone.snapshot() == game.snapshot()
+
+    clone = game.clone()
+    cloned = clone.snapshot()
+    free_cloned = len(clone.free_cells)
+    future(game)
+    assert clone.snapshot() == cloned
+    assert len(clone.free_cells) == free_cloned
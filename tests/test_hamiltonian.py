@@ -0,0 +1,23 @@
+import pytest
+from bench import make_config
+from game.game_state import GameState
+
+def play_to_end(boundary, seed, max_fill):
+    config = make_config('hamiltonian')
+    config['gameplay']['boundary'] = boundary
+    config['ai']['hamiltonian_max_fill'] = max_fill
+    game = GameState(config, seed=seed)
+    while game.tick():
+        pass
+    return game
+
+@pytest.mark.parametrize('seed', range(5))
+def test_small_arena_is_filled(seed):
+    game = play_to_end(2, seed, 0.5)
+    assert game.victory
+    assert len(game.snake.body) == 5 ** 3 - 1
+
+def test_shortcut_limit_is_capped():
+    # Shortcuts all the way to a full arena used to trap this snake at 341 of 342
+    game = play_to_end(3, 0, 1.0)
+    assert game.victory
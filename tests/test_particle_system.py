@@ -0,0 +1,37 @@
+import numpy as np
+from particle_system import ParticleSystem
+
+def half_dead_pool():
+    """Pool at a limit of 100 whose tail half died, leaving stale slots behind"""
+    particles = ParticleSystem(capacity=200, limit=100, seed=0)
+    particles.emit_burst([(0.0, 0.0, 0.0)], 100, (1.0, 1.0, 1.0))
+    particles.lifetimes[50:100] = 0.0
+    particles.update(0.0)
+    assert len(particles) == 50
+
+    # Tag the survivors by x and give them distinct remaining lifetimes
+    particles.positions[:50, 0] = 1000 + np.arange(50)
+    particles.max_lifetimes[:50] = 1.0
+    particles.lifetimes[:50] = np.linspace(0.1, 1.0, 50)
+    return particles
+
+def test_eviction_only_picks_live_particles():
+    particles = half_dead_pool()
+
+    emitted = particles.emit_burst([(0.0, 0.0, 0.0)], 80, (1.0, 0.0, 0.0), speed=(0.0, 0.0))
+
+    x = particles.positions[:len(particles), 0]
+    assert emitted == 80
+    assert len(particles) == 100
+    assert particles.evicted == 30
+    assert np.count_nonzero(x == 0.0) == 80
+    # The 30 faintest old particles went, the 20 brightest stayed
+    assert sorted(x[x >= 1000].astype(int)) == list(range(1030, 1050))
+
+def test_limit_is_never_exceeded():
+    particles = half_dead_pool()
+
+    for _ in range(5):
+        particles.emit_burst([(0.0, 0.0, 0.0)], 70, (1.0, 0.0, 0.0))
+        assert len(particles) == 100
+    assert particles.evicted == 5 * 70 - 50
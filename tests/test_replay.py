@@ -0,0 +1,101 @@
+from bench import make_config
+from game.game_state import GameState
+from game.replay import ReplayRecorder, ReplayReader, ReplayPlayer
+
+def play(player_or_game, frames, start=0, frame_ms=40):
+    """Drive update() like the main loop, one frame_ms frame at a time"""
+    now = start
+    for _ in range(frames):
+        now += frame_ms
+        player_or_game.update(now)
+    return now
+
+def record_with_switches(path):
+    """Record a game whose strategy changes mid-game and while it is dying
+
+    Returns the recorded config and {tick: (body, food, corner reserved)}.
+    """
+    config = make_config('greedy')
+    config['gameplay']['boundary'] = 3
+    config['snake']['speed'] = 20
+    game = GameState(config, seed=7)
+    recorder = ReplayRecorder(path, seed=7, keyframe_interval=64, boundary=3)
+    recorder.attach(game)
+    states = {}
+
+    def remember():
+        states[recorder.tick] = (tuple(game.snake.body), game.food, game.corner_reserved)
+
+    now = 0
+    for frame in range(6000):
+        if frame % 150 == 75:
+            strategy = config['ai']['strategy']
+            config['ai']['strategy'] = 'greedy' if strategy == 'hamiltonian' else 'hamiltonian'
+            game.apply_settings()
+            remember()
+        now = play(game, 1, now)
+        remember()
+    recorder.close()
+    return config, states
+
+def test_seek_restores_the_corner_across_switches(tmp_path):
+    path = str(tmp_path / 'switch.replay')
+    config, states = record_with_switches(path)
+    reader = ReplayReader(path)
+    assert len(set(reservation for _, _, reservation in states.values())) == 2
+
+    config['ai']['strategy'] = 'greedy'  # The viewer's choice must not matter
+    game = GameState(config)
+    for tick, state in states.items():
+        assert reader.seek(game, tick) == tick
+        assert (tuple(game.snake.body), game.food, game.corner_reserved) == state
+    reader.close()
+
+def test_playback_follows_recorded_switches(tmp_path):
+    path = str(tmp_path / 'switch.replay')
+    config, states = record_with_switches(path)
+    reader = ReplayReader(path)
+
+    for viewer_strategy in ('greedy', 'hamiltonian'):
+        config['ai']['strategy'] = viewer_strategy
+        game = GameState(config)
+        player = ReplayPlayer(reader, game)
+        now = 0
+        mismatched = []
+        while not player.finished:
+            now = play(player, 1, now)
+            expected = states.get(player.tick)
+            if expected is not None and not game.dying and (
+                    (tuple(game.snake.body), game.food) != expected[:2]):
+                mismatched.append(player.tick)
+        assert mismatched == []
+    reader.close()
+
+def test_seek_reproduces_the_recorded_game(tmp_path):
+    path = str(tmp_path / 'game.replay')
+    config = make_config('greedy')
+    config['gameplay']['boundary'] = 4
+    game = GameState(config, seed=5)
+    recorder = ReplayRecorder(path, seed=5, keyframe_interval=100, boundary=4)
+    recorder.attach(game)
+    saved = {}
+    for move in range(3000):
+        if move % 211 == 0:
+            game.grow_snake()
+        if move % 1009 == 1008:
+            game.kill()
+        if game.dying or not game.tick():
+            game.reset()
+        if move % 37 == 0:
+            saved[recorder.tick] = game.snapshot()
+    saved[recorder.tick] = game.snapshot()
+    recorder.close()
+
+    reader = ReplayReader(path)
+    assert reader.seed == 5 and reader.boundary == 4
+    assert reader.tick_count == recorder.tick
+    replayed = GameState(config)
+    for tick, snapshot in saved.items():
+        assert reader.seek(replayed, tick) == tick
+        assert replayed.snapshot() == snapshot
+    reader.close()
@@ -0,0 +1,105 @@
+"""Run many seeded headless games across a process pool
+
+Games are handed out in chunks of seeds; every game draws its food from an
+RNG seeded with its seed, so greedy and hamiltonian games play out the same
+whichever worker plays them. astar and lookahead stop searching when their
+wall-clock budget runs out, so their games depend on machine load and are
+not reproducible. Per-game results stream back as chunks finish and are
+aggregated at the end.
+
+    python tournament.py --games 5000 --strategy astar
+    python tournament.py --games 5000 --workers 8 --json results.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from config import config
+from bench import make_config, run_game, summarize
+
+_worker_config = None
+
+def _init_worker(strategy, particles):
+    """Build the game config once per worker process"""
+    global _worker_config
+    _worker_config = make_config(strategy, particles)
+
+def _play_chunk(seeds, max_ticks):
+    results = []
+    for seed in seeds:
+        results.append(run_game(_worker_config, seed, max_ticks))
+    return results
+
+def iter_results(seeds, max_ticks, workers=None, chunk_size=16, strategy=None, particles=False):
+    """Play every seed on a process pool, yielding per-game results as they finish"""
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(strategy, particles)) as pool:
+        futures = [pool.submit(_play_chunk, chunk, max_ticks) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+def aggregate(results, wall_time):
+    """bench.summarize plus tournament-level throughput and score stats"""
+    summary = summarize(results)
+    scores = np.array([r['length'] - 1 for r in results])
+    summary['mean_score'] = float(scores.mean())
+    summary['tournament_wall_time'] = wall_time
+    summary['games_per_sec'] = len(results) / wall_time if wall_time > 0 else 0.0
+    # Simulated ticks across all workers per second of real time
+    summary['aggregate_ticks_per_sec'] = summary['ticks'] / wall_time if wall_time > 0 else 0.0
+    return summary
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=1000, help="number of games to play")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--max-ticks', type=int, default=20000,
+                        help="stop a game after this many moves")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="worker processes (defaults to the CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=16,
+                        help="games sent to a worker at a time")
+    parser.add_argument('--strategy', choices=config['ai']['strategies'],
+                        help="AI strategy (defaults to the configured one); astar and "
+                        "lookahead search on a time budget, so their games are not deterministic")
+    parser.add_argument('--particles', action='store_true',
+                        help="simulate particles as well")
+    parser.add_argument('--quiet', action='store_true', help="skip per-game lines")
+    parser.add_argument('--json', help="write per-game results and the summary here")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    seeds = list(range(args.seed, args.seed + args.games))
+
+    results = []
+    start = time.perf_counter()
+    for result in iter_results(seeds, args.max_ticks, args.workers, args.chunk_size,
+                               args.strategy, args.particles):
+        results.append(result)
+        if not args.quiet:
+            print(f"[{len(results)}/{len(seeds)}] seed={result['seed']} "
+                  f"length={result['length']} ticks={result['ticks']} cause={result['cause']}")
+    wall_time = time.perf_counter() - start
+
+    results.sort(key=lambda r: r['seed'])
+    summary = aggregate(results, wall_time)
+    lengths = summary['length_percentiles']
+    print(f"games:          {summary['games']} on {args.workers} workers")
+    print(f"games/sec:      {summary['games_per_sec']:.1f}")
+    print(f"ticks/sec:      {summary['aggregate_ticks_per_sec']:.0f} aggregate")
+    print(f"mean score:     {summary['mean_score']:.1f}")
+    print("length:         " + "  ".join(f"{k}={v:.0f}" for k, v in lengths.items()))
+    print("death causes:   " + "  ".join(f"{k}={v}" for k, v in sorted(summary['causes'].items())))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'summary': summary, 'games': results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())